@@ -0,0 +1,113 @@
+from typing import Optional
+import hashlib
+import logging
+import os
+import pickle
+import numpy as np
+
+from .embedding_cache import QueryEmbeddingCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """Answers of questions per domain version and file selection, kept in Redis
+
+    Each key holds a list of encrypted entries, one per question, capped at
+    the newest max_questions.
+    """
+
+    def __init__(self, redis_manager, encryptor=None):
+        self.redis_manager = redis_manager
+        # Answers quote document text, they are only stored encrypted
+        self.enabled = (
+            os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+            and encryptor is not None
+        )
+        self.encryptor = encryptor
+        # Zero disables matching of similar questions, only equal ones hit
+        self.similarity_threshold = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0))
+        self.max_questions = int(os.getenv("ANSWER_CACHE_MAX_QUESTIONS", 50))
+        self.expiry = int(os.getenv("ANSWER_CACHE_TTL", 3600))
+
+    @staticmethod
+    def make_key(domain_id: str, domain_version: str, file_ids: list) -> str:
+        selection = ",".join(sorted(str(file_id) for file_id in file_ids))
+        selection_hash = hashlib.sha1(selection.encode("utf-8")).hexdigest()
+        return f"answer_cache:{domain_id}:{domain_version}:{selection_hash}"
+
+    @staticmethod
+    def _domain_id(key: str) -> str:
+        return key.split(":")[1]
+
+    def get(
+        self, key: str, question: str, question_embedding: np.ndarray = None
+    ) -> Optional[dict]:
+        """Answer of the same question, or of the most similar one above threshold"""
+        if not self.enabled:
+            return None
+
+        entries = self._entries(key)
+        question = QueryEmbeddingCache.normalize(question)
+
+        match_similar = self.similarity_threshold > 0 and question_embedding is not None
+
+        best_answer, best_similarity = None, self.similarity_threshold
+        for entry in entries:
+            if entry["question"] == question:
+                return entry["answer"]
+            if match_similar and entry["embedding"] is not None:
+                similarity = float(
+                    np.dot(
+                        np.asarray(question_embedding, dtype=np.float32),
+                        np.asarray(entry["embedding"], dtype=np.float32),
+                    )
+                )
+                if similarity >= best_similarity:
+                    best_answer, best_similarity = entry["answer"], similarity
+        return best_answer
+
+    def put(
+        self,
+        key: str,
+        question: str,
+        answer: dict,
+        question_embedding: np.ndarray = None,
+    ) -> bool:
+        if not self.enabled:
+            return False
+
+        entry = pickle.dumps(
+            {
+                "question": QueryEmbeddingCache.normalize(question),
+                "embedding": question_embedding,
+                "answer": answer,
+            }
+        )
+        # Domain id is the associated data, entries cannot move across domains
+        return self.redis_manager.push_capped_list(
+            key,
+            self.encryptor.encrypt_bytes(entry, self._domain_id(key)),
+            max_length=self.max_questions,
+            expiry=self.expiry,
+        )
+
+    def _entries(self, key: str) -> list:
+        domain_id = self._domain_id(key)
+        entries = []
+        for encrypted in self.redis_manager.get_list_bytes(key):
+            try:
+                entries.append(
+                    pickle.loads(self.encryptor.decrypt_bytes(encrypted, domain_id))
+                )
+            except Exception as e:
+                logger.warning(f"Answer cache entry of {key} unreadable: {str(e)}")
+        return entries
+
+    def invalidate_domain(self, domain_id: str) -> int:
+        """Drop cached answers of every version and file selection of a domain"""
+        keys = self.redis_manager.get_keys_by_pattern(f"answer_cache:{domain_id}:*")
+        for key in keys:
+            self.redis_manager.delete_data(key)
+        return len(keys)
@@ -1,17 +1,20 @@
 from typing import List
+from bisect import bisect_left, bisect_right
 import numpy as np
 import bcrypt
 import re
 import base64
 import os
 from dotenv import load_dotenv
+from langdetect import detect, LangDetectException
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
-from ..functions.reading_functions import ReadingFunctions
+from ..functions.reading_pool import ReadingPool
 from ..functions.embedding_functions import EmbeddingFunctions
 from ..functions.indexing_functions import IndexingFunctions
 from ..functions.chatbot_functions import ChatbotFunctions
 from ..functions.scraping_functions import Webscraper
+from ..metrics import stage_timer, timed_stream
 
 
 class Authenticator:
@@ -54,6 +57,15 @@ class Encryptor:
         except Exception as e:
             raise e
 
+    def encrypt_bytes(self, data: bytes, auth_data: str) -> bytes:
+        nonce = os.urandom(12)
+        return nonce + self.aesgcm.encrypt(nonce, data, auth_data.encode("utf-8"))
+
+    def decrypt_bytes(self, encrypted_data: bytes, auth_data: str) -> bytes:
+        return self.aesgcm.decrypt(
+            encrypted_data[:12], encrypted_data[12:], auth_data.encode("utf-8")
+        )
+
     def encrypt_email(self, email: str) -> str:
         try:
             encrypted_data = self.aesgcm.encrypt(
@@ -95,54 +107,130 @@ class Processor:
         self,
     ):
         self.ef = EmbeddingFunctions()
-        self.rf = ReadingFunctions()
+        self.en = Encryptor()
+        self.rf = ReadingPool(encryptor=self.en)
         self.indf = IndexingFunctions()
         self.cf = ChatbotFunctions()
-        self.en = Encryptor()
         self.ws = Webscraper()
+        self.search_top_k = int(os.getenv("SEARCH_TOP_K", 300))
+        self.exact_search = os.getenv("SEARCH_EXACT", "false").lower() == "true"
+
+    def create_index(
+        self,
+        embeddings: np.ndarray,
+        index_type: str = "auto",
+        quantization: str = "none",
+    ):
+        if index_type == "auto":
+            index_type = self.indf.select_index_type(sentence_amount=len(embeddings))
 
-    def create_index(self, embeddings: np.ndarray, index_type: str = "flat"):
         if index_type == "flat":
-            index = self.indf.create_flat_index(embeddings=embeddings)
+            index = self.indf.create_flat_index(
+                embeddings=embeddings, quantization=quantization
+            )
+        elif index_type == "hnsw":
+            index = self.indf.create_hnsw_index(
+                embeddings=embeddings, quantization=quantization
+            )
+        elif index_type == "ivf":
+            index = self.indf.create_ivf_index(
+                embeddings=embeddings, quantization=quantization
+            )
+        else:
+            raise ValueError(f"Unsupported index type: {index_type}")
         return index
 
-    def filter_search(
-        self, domain_content: dict, domain_embeddings: np.ndarray, file_ids: list
+    def create_search_data(
+        self,
+        domain_content: List[tuple],
+        domain_embeddings: np.ndarray,
+        boost_info: dict = None,
     ):
-        filtered_indexes = []
-        filtered_content = []
-
-        for i, content in enumerate(domain_content):
-            if content[4] in file_ids:
-                filtered_indexes.append(i)
-                filtered_content.append(content)
-
-        filtered_embeddings = domain_embeddings[filtered_indexes]
-
-        index = self.create_index(embeddings=filtered_embeddings)
-        boost_info = self.extract_boost_info(
-            domain_content=filtered_content, embeddings=filtered_embeddings
+        index = self.create_index(
+            embeddings=domain_embeddings, quantization=self.indf.quantization
         )
+        if boost_info is None:
+            boost_info = self.extract_boost_info(
+                domain_content=domain_content, embeddings=domain_embeddings
+            )
 
         try:
             index_header = self.create_index(embeddings=boost_info["header_embeddings"])
         except IndexError:
             index_header = None
 
-        return index, filtered_content, boost_info, index_header
+        return {
+            "index": index,
+            "index_header": index_header,
+            "domain_content": domain_content,
+            "boost_info": boost_info,
+        }
+
+    def filter_search(self, boost_info: dict, file_ids: list):
+        """Restrict the domain-wide indexes to selected files without copying"""
+        selected_codes = [
+            file_code
+            for file_code, file_id in enumerate(boost_info["file_ids"])
+            if file_id in file_ids
+        ]
+
+        if not selected_codes:
+            return None
+
+        sentence_mask = np.isin(boost_info["file_codes"], selected_codes)
 
-    def search_index(
+        header_mask = sentence_mask[boost_info["header_indexes"]]
+
+        return {
+            "sentence_mask": sentence_mask,
+            "sentence_amount": int(np.count_nonzero(sentence_mask)),
+            "selector": self.indf.create_selector(mask=sentence_mask),
+            "header_selector": (
+                self.indf.create_selector(mask=header_mask)
+                if header_mask.any()
+                else None
+            ),
+        }
+
+    def search_data_size(self, search_data: dict):
+        """Approximate memory footprint of search data in bytes"""
+        index = search_data["index"]
+        index_header = search_data["index_header"]
+        boost_info = search_data["boost_info"]
+
+        size = self.indf.index_size(index)
+        size += self.indf.index_size(index_header) if index_header else 0
+        size += sum(len(content[0]) for content in search_data["domain_content"])
+        size += boost_info["header_embeddings"].nbytes
+        size += boost_info["file_embeddings"].nbytes
+        size += boost_info["file_codes"].nbytes
+        size += boost_info["header_segments"].nbytes
+        return size
+
+    async def search_index(
         self,
         user_query: str,
         domain_content: dict,
         boost_info: dict,
         index,
         index_header,
+        selection: dict,
+        embedding_loader=None,
+        file_lang: str = None,
+        stream: bool = False,
     ):
-        file_lang = self.file_lang_detection(domain_content=domain_content)
-        queries, lang = self.query_preprocessing(
-            user_query=user_query, file_lang=file_lang
-        )
+        # Files stored before language detection at ingestion have no language
+        if not file_lang:
+            file_lang = self.file_lang_detection(
+                sentences=[
+                    self.en.decrypt(domain_content[i][0], domain_content[i][4])
+                    for i in np.flatnonzero(selection["sentence_mask"])[:25]
+                ]
+            )
+        with stage_timer("query_generation"):
+            queries, lang = await self.query_preprocessing(
+                user_query=user_query, file_lang=file_lang
+            )
         if not queries:
             if lang == "tr":
                 return (
@@ -157,55 +245,20 @@ class Processor:
                     None,
                 )
 
-        query_embeddings = self.ef.create_embeddings_from_sentences(
-            sentences=queries[:-1]
-        )
+        with stage_timer("embeddings"):
+            query_embeddings = await self.ef.create_query_embeddings(
+                queries=queries[:-1]
+            )
 
-        boost_array = self._create_boost_array(
-            header_indexes=boost_info["header_indexes"],
-            sentence_amount=index.ntotal,
-            query_vector=query_embeddings[0],
+        sorted_sentence_indexes = self.rank_sentences(
+            query_embeddings=query_embeddings,
+            boost_info=boost_info,
+            index=index,
             index_header=index_header,
+            selection=selection,
+            embedding_loader=embedding_loader,
         )
 
-        # Get search distances with occurrences
-        dict_resource = {}
-        for i, query_embedding in enumerate(query_embeddings):
-            D, I = index.search(query_embedding.reshape(1, -1), len(domain_content))  # noqa: E741
-            if i == 0:
-                convergence_vector, distance_vector = I[0], D[0]
-            for i, match_index in enumerate(I[0]):
-                if match_index in dict_resource:
-                    dict_resource[match_index].append(D[0][i])
-                else:
-                    dict_resource[match_index] = [D[0][i]]
-
-        file_boost_array = self._create_file_boost_array(
-            domain_content=domain_content,
-            distance_vector=distance_vector,
-            convergence_vector=convergence_vector,
-        )
-
-        # Combine boost arrays
-        combined_boost_array = 0.25 * file_boost_array + 0.75 * boost_array
-
-        # Get average occurrences
-        dict_resource = self._avg_resources(dict_resource)
-
-        for key in dict_resource:
-            dict_resource[key] *= combined_boost_array[key]
-
-        sorted_dict = dict(
-            sorted(dict_resource.items(), key=lambda item: item[1], reverse=True)
-        )
-
-        filtered_indexes = [
-            sentence_index
-            for sentence_index in sorted_dict.keys()
-            if sorted_dict[sentence_index] >= 0.35
-        ]
-        sorted_sentence_indexes = filtered_indexes[:10]
-
         # Early return with message
         if not sorted_sentence_indexes:
             if lang == "tr":
@@ -222,21 +275,90 @@ class Processor:
                 )
 
         # Sentences to context creation
-        context, context_windows, resources = self.context_creator(
-            sentence_index_list=sorted_sentence_indexes,
-            domain_content=domain_content,
-            header_indexes=boost_info["header_indexes"],
-            table_indexes=boost_info["table_indexes"],
+        with stage_timer("context_creator"):
+            context, context_windows, resources = self.context_creator(
+                sentence_index_list=sorted_sentence_indexes,
+                domain_content=domain_content,
+                header_indexes=boost_info["header_indexes"],
+                table_indexes=boost_info["table_indexes"],
+                file_run_offsets=boost_info["file_run_offsets"],
+            )
+
+        if stream:
+            answer = timed_stream(
+                "response_generation",
+                self.cf.response_generation_stream(
+                    query=user_query, context=context, intention=queries[-1]
+                ),
+            )
+        else:
+            with stage_timer("response_generation"):
+                answer = await self.cf.response_generation(
+                    query=user_query, context=context, intention=queries[-1]
+                )
+
+        return answer, resources, context_windows
+
+    def rank_sentences(
+        self,
+        query_embeddings: np.ndarray,
+        boost_info: dict,
+        index,
+        index_header,
+        selection: dict,
+        embedding_loader=None,
+    ):
+        """Best sentences of the selection for the queries, fused with boosts"""
+        # Search all queries at once, bounded by top-k unless exact search is set
+        query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+        k = selection["sentence_amount"]
+        if not self.exact_search:
+            k = min(self.search_top_k, k)
+        with stage_timer("faiss_search"):
+            _, I = self.indf.search(  # noqa: E741
+                index=index,
+                query_vectors=query_matrix,
+                k=k,
+                selector=selection["selector"],
+            )
+
+        # Score candidates of any query against all queries, full precision
+        # vectors are loaded when the index only keeps quantized codes
+        candidates = np.unique(I[I >= 0])
+        candidate_embeddings = (
+            embedding_loader(candidates) if embedding_loader else None
+        )
+        if candidate_embeddings is None:
+            candidate_embeddings = index.reconstruct_batch(candidates)
+        candidate_distances = (
+            np.asarray(candidate_embeddings, dtype=np.float32) @ query_matrix.T
         )
 
-        answer = self.cf.response_generation(
-            query=user_query, context=context, intention=queries[-1]
+        # Boosts are only needed for the candidates
+        boost_array = self._create_boost_array(
+            header_segments=boost_info["header_segments"][candidates],
+            query_vector=query_embeddings[0],
+            index_header=index_header if selection["header_selector"] else None,
+            header_selector=selection["header_selector"],
+        )
+        file_boost_array = self._create_file_boost_array(
+            file_codes=boost_info["file_codes"][candidates],
+            file_embeddings=boost_info["file_embeddings"],
+            query_vector=query_embeddings[0],
         )
 
-        return answer, resources, context_windows
+        # Combine boost arrays
+        combined_boost_array = 0.25 * file_boost_array + 0.75 * boost_array
+
+        # Average distances over queries with occurrence coefficient
+        candidate_scores = (
+            candidate_distances.mean(axis=1) + candidate_distances.shape[1] * 0.0025
+        ) * combined_boost_array
+
+        return self._rank_resources(candidates=candidates, scores=candidate_scores)
 
-    def query_preprocessing(self, user_query, file_lang):
-        generated_queries, lang = self.cf.query_generation(
+    async def query_preprocessing(self, user_query, file_lang):
+        generated_queries, lang = await self.cf.query_generation(
             query=user_query, file_lang=file_lang
         )
         splitted_queries = generated_queries.split("\n")
@@ -247,67 +369,93 @@ class Processor:
 
     def _create_boost_array(
         self,
-        header_indexes: list,
-        sentence_amount: int,
+        header_segments: np.ndarray,
         query_vector: np.ndarray,
         index_header,
+        header_selector=None,
     ):
-        boost_array = np.ones(sentence_amount)
-
+        """Header boost of sentences, given the header segment of each sentence"""
         if not index_header:
-            return boost_array
+            return np.ones(len(header_segments))
 
-        D, I = index_header.search(query_vector.reshape(1, -1), 10)  # noqa: E741
-        filtered_header_indexes = [
-            header_index
-            for index, header_index in enumerate(I[0])
-            if D[0][index] > 0.30
-        ]
+        D, I = self.indf.search(  # noqa: E741
+            index=index_header,
+            query_vectors=query_vector.reshape(1, -1),
+            k=10,
+            selector=header_selector,
+        )
+        filtered_header_indexes = I[0][(I[0] >= 0) & (D[0] > 0.30)]
 
-        if not filtered_header_indexes:
-            return boost_array
-        else:
-            for i, filtered_index in enumerate(filtered_header_indexes):
-                try:
-                    start = header_indexes[filtered_index] + 1
-                    end = header_indexes[filtered_index + 1]
-                    if i > 2:
-                        boost_array[start:end] *= 1.1
-                    elif i > 0:
-                        boost_array[start:end] *= 1.2
-                    else:
-                        boost_array[start:end] *= 1.3
-                except IndexError as e:
-                    print(f"List is out of range {e}")
-                    continue
-            return boost_array
+        # Last segment id is used by sentences without a header
+        header_boost = np.ones(index_header.ntotal + 1)
+        header_ranks = np.arange(len(filtered_header_indexes))
+        header_boost[filtered_header_indexes] = np.where(
+            header_ranks > 2, 1.1, np.where(header_ranks > 0, 1.2, 1.3)
+        )
+        return header_boost[header_segments]
 
     # File boost function
     def _create_file_boost_array(
         self,
-        domain_content: list,
-        distance_vector: np.ndarray,
-        convergence_vector: np.ndarray,
+        file_codes: np.ndarray,
+        file_embeddings: np.ndarray,
+        query_vector: np.ndarray,
     ):
-        boost_array = np.ones(len(domain_content))
-        sort_order = np.argsort(convergence_vector)
-        sorted_scores = distance_vector[sort_order]
-        file_counts = {}
-
-        if not domain_content:
-            return boost_array
-        else:
-            for _, _, _, _, _, filename in domain_content:
-                file_counts[filename] = file_counts.get(filename, 0) + 1
-
-            file_sentence_counts = np.cumsum([0] + list(file_counts.values()))
-
-            for i in range(len(file_sentence_counts) - 1):
-                start, end = file_sentence_counts[i], file_sentence_counts[i + 1]
-                if np.mean(sorted_scores[start:end]) > 0.30:
-                    boost_array[start:end] *= 1.1
-
-        return boost_array
+        """File boost of sentences, given the file code of each sentence"""
+        # Mean score of a file equals the score of its mean embedding
+        file_scores = file_embeddings @ query_vector.astype(np.float32)
+        file_boost = np.where(file_scores > 0.30, 1.1, 1.0)
+        return file_boost[file_codes]
+
+    @staticmethod
+    def window_bounds(
+        sentence_index: int,
+        window_size: int,
+        header_indexes: list,
+        lower: int,
+        upper: int,
+    ) -> tuple:
+        """First and last sentence of the context window around a sentence
+
+        Windows stay within the file run [lower, upper] and stretch to the
+        surrounding headers when those are at most 20 sentences away.
+        """
+        start = max(lower, sentence_index - window_size)
+        end = min(upper, sentence_index + window_size)
+
+        # Only headers of the sentence's own file shape its window
+        first_header = bisect_left(header_indexes, lower)
+        last_header = bisect_right(header_indexes, upper)
+        if first_header < last_header:
+            # Last header at or before the sentence, and the one after it
+            header_position = bisect_right(
+                header_indexes, sentence_index, first_header, last_header
+            )
+            next_header = (
+                header_indexes[header_position]
+                if header_position < last_header
+                else None
+            )
+            header_position -= 1
+
+            if header_position < first_header:
+                # Sentences before the first header measure to the last
+                # header of the file
+                if header_indexes[last_header - 1] - sentence_index <= 20:
+                    start = sentence_index
+            elif header_indexes[header_position] == sentence_index:
+                start = sentence_index
+                if next_header is not None and next_header - sentence_index <= 20:
+                    end = next_header - 1
+            elif next_header is not None:
+                current_header = header_indexes[header_position]
+                if sentence_index - current_header <= 20:
+                    start = current_header
+                if next_header - sentence_index <= 20:
+                    end = next_header - 1
+            start, end = max(lower, start), min(upper, end)
+
+        return start, end
 
     def context_creator(
         self,
@@ -315,6 +463,7 @@ class Processor:
         domain_content: List[tuple],
         header_indexes: list,
         table_indexes: list,
+        file_run_offsets: np.ndarray,
     ):
         context = ""
         context_windows = []
@@ -322,64 +471,31 @@ class Processor:
 
         for i, sentence_index in enumerate(sentence_index_list):
             window_size = 4 if i < 3 else 2
-            start = max(0, sentence_index - window_size)
-            end = min(len(domain_content) - 1, sentence_index + window_size)
-
-            if table_indexes:
-                for table_index in table_indexes:
-                    if sentence_index == table_index:
-                        widened_indexes.append((table_index, table_index))
-                        table_indexes.remove(table_index)
-                        break
-
-            if not header_indexes:
-                widened_indexes.append((start, end))
-            else:
-                for i, current_header in enumerate(header_indexes):
-                    if sentence_index == current_header:
-                        start = max(0, sentence_index)
-                        if (
-                            i + 1 < len(header_indexes)
-                            and abs(sentence_index - header_indexes[i + 1]) <= 20
-                        ):
-                            end = min(
-                                len(domain_content) - 1, header_indexes[i + 1] - 1
-                            )
-                        else:
-                            end = min(
-                                len(domain_content) - 1, sentence_index + window_size
-                            )
-                        break
-                    elif (
-                        i + 1 < len(header_indexes)
-                        and current_header < sentence_index < header_indexes[i + 1]
-                    ):
-                        start = (
-                            current_header
-                            if abs(sentence_index - current_header) <= 20
-                            else max(0, sentence_index - window_size)
-                        )
-                        end = (
-                            header_indexes[i + 1] - 1
-                            if abs(header_indexes[i + 1] - sentence_index) <= 20
-                            else min(
-                                len(domain_content) - 1, sentence_index + window_size
-                            )
-                        )
-                        break
-                    elif (
-                        i == len(header_indexes) - 1
-                        and current_header >= sentence_index
-                    ):
-                        start = (
-                            max(0, sentence_index)
-                            if abs(current_header - sentence_index) <= 20
-                            else max(0, sentence_index - window_size)
-                        )
-                        end = min(len(domain_content) - 1, sentence_index + window_size)
-                        break
-                if (start, end) not in widened_indexes:
-                    widened_indexes.append((start, end))
+
+            # Windows never leave the file of the sentence
+            run_index = (
+                np.searchsorted(file_run_offsets, sentence_index, side="right") - 1
+            )
+            lower = file_run_offsets[run_index]
+            upper = file_run_offsets[run_index + 1] - 1
+
+            # Tables are added once more as a standalone window
+            table_position = bisect_left(table_indexes, sentence_index)
+            if (
+                table_position < len(table_indexes)
+                and table_indexes[table_position] == sentence_index
+            ):
+                widened_indexes.append((sentence_index, sentence_index))
+
+            widened_indexes.append(
+                self.window_bounds(
+                    sentence_index=sentence_index,
+                    window_size=window_size,
+                    header_indexes=header_indexes,
+                    lower=lower,
+                    upper=upper,
+                )
+            )
 
         merged_truples = self.merge_tuples(widen_sentences=widened_indexes)
 
@@ -410,12 +526,18 @@ class Processor:
 
         return context, context_windows, resources
 
-    def _avg_resources(self, resources_dict):
-        for key, value in resources_dict.items():
-            value_mean = sum(value) / len(value)
-            value_coefficient = value_mean + len(value) * 0.0025
-            resources_dict[key] = value_coefficient
-        return resources_dict
+    def _rank_resources(
+        self,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        amount: int = 10,
+        threshold: float = 0.35,
+    ):
+        passing = np.flatnonzero(scores >= threshold)
+        if len(passing) > amount:
+            passing = passing[np.argpartition(-scores[passing], amount - 1)[:amount]]
+        passing = passing[np.argsort(-scores[passing], kind="stable")]
+        return candidates[passing].tolist()
 
     def _extract_resources(self, sentence_indexes: list, domain_content: List[tuple]):
         resources = {"file_names": [], "page_numbers": []}
@@ -431,59 +553,130 @@ class Processor:
         return context
 
     def extract_boost_info(self, domain_content: List[tuple], embeddings: np.ndarray):
+        sentence_amount = len(domain_content)
+        is_header = np.fromiter(
+            (content[1] for content in domain_content),
+            dtype=bool,
+            count=sentence_amount,
+        )
+        is_table = np.fromiter(
+            (content[2] for content in domain_content),
+            dtype=bool,
+            count=sentence_amount,
+        )
+
+        # Files are coded by order of appearance, rows may be interleaved
+        file_code_map = {}
+        file_codes = np.fromiter(
+            (
+                file_code_map.setdefault(content[4], len(file_code_map))
+                for content in domain_content
+            ),
+            dtype=np.int32,
+            count=sentence_amount,
+        )
+
+        header_indexes = np.flatnonzero(is_header)
         boost_info = {
-            "header_indexes": [],
-            "headers": [],
-            "header_embeddings": [],
-            "table_indexes": [],
+            "header_indexes": header_indexes.tolist(),
+            "headers": [domain_content[index][0] for index in header_indexes],
+            "header_embeddings": embeddings[header_indexes],
+            "table_indexes": np.flatnonzero(is_table).tolist(),
+            "file_ids": list(file_code_map.keys()),
+            "file_codes": file_codes,
         }
-        for index in range(len(domain_content)):
-            if domain_content[index][1]:
-                boost_info["header_indexes"].append(index)
-                boost_info["headers"].append(domain_content[index][0])
-
-            if domain_content[index][2]:
-                boost_info["table_indexes"].append(index)
-        boost_info["header_embeddings"] = embeddings[boost_info["header_indexes"]]
-        return boost_info
 
-    def merge_tuples(self, widen_sentences):
-        sorted_dict = {0: widen_sentences[0]}
-
-        for sentence_tuple in widen_sentences[1:]:
-            tuple_range = range(sentence_tuple[0], sentence_tuple[1])
-            is_in = 0
-            for index, value in sorted_dict.items():
-                current_range = range(value[0], value[1])
-                if set(tuple_range) & set(current_range):
-                    interval = (
-                        min(sorted_dict[index][0], sentence_tuple[0]),
-                        max(sorted_dict[index][1], sentence_tuple[1]),
-                    )
-                    sorted_dict[index] = interval
-                    is_in = 1
+        # Rows of each file, in row order
+        file_order = np.argsort(file_codes, kind="stable")
+        sorted_codes = file_codes[file_order]
+        file_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        file_ends = np.r_[file_starts[1:], sentence_amount]
+
+        # Segment mean of embeddings per file
+        boost_info["file_embeddings"] = np.array(
+            [
+                embeddings[file_order[start:end]].mean(axis=0, dtype=np.float32)
+                for start, end in zip(file_starts, file_ends)
+            ],
+            dtype=np.float32,
+        )
 
-            if not is_in:
-                sorted_dict[index + 1] = sentence_tuple
+        # Header segment of each row is the last header before it in the same
+        # file, header rows and rows before a first header get the last id
+        sorted_is_header = is_header[file_order]
+        header_position = np.cumsum(sorted_is_header) - 1
+        # Trailing sentinel row is picked for rows before any header
+        last_header_rows = np.append(file_order[sorted_is_header], 0)[header_position]
+        in_segment = (
+            (header_position >= 0)
+            & ~sorted_is_header
+            & (file_codes[last_header_rows] == sorted_codes)
+        )
+        header_segments = np.full(sentence_amount, len(header_indexes), dtype=np.int32)
+        header_segments[file_order[in_segment]] = np.searchsorted(
+            header_indexes, last_header_rows[in_segment]
+        )
+        boost_info["header_segments"] = header_segments
 
-        return list(dict.fromkeys(sorted_dict.values()))
+        # Contiguous runs of rows from the same file bound context windows
+        boost_info["file_run_offsets"] = np.r_[
+            0, np.flatnonzero(np.diff(file_codes)) + 1, sentence_amount
+        ]
+        return boost_info
 
-    def file_lang_detection(self, domain_content: List[tuple]):
-        file_lang = {}
-        detected_sentence_amount = (
-            25 if len(domain_content) > 25 else len(domain_content)
+    def merge_tuples(self, widen_sentences):
+        """Merge overlapping windows, ordered by their best ranked window"""
+        # Single sentence windows are tables and stay on their own
+        merged = [
+            [start, end, rank]
+            for rank, (start, end) in enumerate(widen_sentences)
+            if start == end
+        ]
+
+        windows = sorted(
+            (start, end, rank)
+            for rank, (start, end) in enumerate(widen_sentences)
+            if start != end
+        )
+        current = None
+        for start, end, rank in windows:
+            if current is not None and start <= current[1]:
+                current[1] = max(current[1], end)
+                current[2] = min(current[2], rank)
+            else:
+                current = [start, end, rank]
+                merged.append(current)
+
+        merged.sort(key=lambda window: window[2])
+        return list(dict.fromkeys((start, end) for start, end, _ in merged))
+
+    @staticmethod
+    def file_lang_detection(sentences: List[str]) -> str:
+        """Language of a file from its first sentences, always "tr" or "en"
+
+        Sentences are detected as one text, single sentences are too short
+        for a reliable guess and carry spaces and punctuation.
+        """
+        text = " ".join(
+            sentence.replace("|", " ")
+            for sentence in sentences[:25]
+            if re.search(r"[^\W\d_]{4,}", sentence)
         )
+        if not text:
+            return "en"
+        try:
+            return "tr" if detect(text) == "tr" else "en"
+        except LangDetectException:
+            return "en"
 
-        for i in range(0, detected_sentence_amount):
-            decrypted_content = self.en.decrypt(
-                domain_content[i][0], domain_content[i][4]
-            )
-            if re.match(r"\b[a-zA-Z]{" + str(4) + r",}\b", decrypted_content) or (
-                decrypted_content[0] == "|" and decrypted_content[-1] == "|"
-            ):
-                lang = self.cf.detect_language(decrypted_content)
-                file_lang[lang] = file_lang.get(lang, 0) + 1
+    def majority_file_lang(self, file_langs: dict, file_ids: list):
+        """Most common stored language among selected files"""
+        lang_counts = {}
+        for file_id in file_ids:
+            lang = file_langs.get(file_id)
+            if lang:
+                lang_counts[lang] = lang_counts.get(lang, 0) + 1
         try:
-            return max(file_lang, key=file_lang.get)
+            return max(lang_counts, key=lang_counts.get)
         except ValueError:
-            return "en"
+            return None
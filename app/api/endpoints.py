@@ -5,27 +5,37 @@ from google.auth.transport import requests
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from datetime import datetime
+from functools import partial
+import asyncio
 import os
 import logging
 import uuid
 import base64
 import psycopg2
 import io
+import json
 
 from .core import Processor
 from .core import Authenticator
 from .core import Encryptor
 from ..db.database import Database
 from ..redis_manager import RedisManager, RedisConnectionError
+from ..index_cache import IndexCache
+from ..answer_cache import AnswerCache
+from ..metrics import QA_REQUESTS, stage_timer
+from ..profiling import current_profile_id
+from ..job_queue import IngestionQueue, IngestionError, RedisJobStore, LocalJobStore
 
 # services
 router = APIRouter()
 processor = Processor()
 authenticator = Authenticator()
 redis_manager = RedisManager()
+index_cache = IndexCache()
 encryptor = Encryptor()
+answer_cache = AnswerCache(redis_manager, encryptor=encryptor)
 
 # logger
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +46,17 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI_DEV")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+INGESTION_QUEUE_BACKEND = os.getenv("INGESTION_QUEUE_BACKEND", "redis").lower()
+
+# ingestion jobs
+ingestion_queue = IngestionQueue(
+    LocalJobStore()
+    if INGESTION_QUEUE_BACKEND == "local"
+    else RedisJobStore(redis_manager)
+)
+ingestion_stop = asyncio.Event()
+ingestion_tasks = []
 
 
 # request functions
@@ -221,7 +242,7 @@ async def select_domain(
     try:
         data = await request.json()
         selected_domain_id = data.get("domain_id")
-        _, _, success = update_selected_domain(
+        _, _, success = await update_selected_domain(
             user_id=userID, domain_id=selected_domain_id
         )
 
@@ -252,82 +273,126 @@ async def generate_answer(
 ):
     try:
         data = await request.json()
-        user_message = data.get("user_message")
-        file_ids = data.get("file_ids")
-
-        # Check if domain is selected
-        selected_domain_id = redis_manager.get_data(f"user:{userID}:selected_domain")
-        if not selected_domain_id:
-            return JSONResponse(
-                content={"message": "Please select a domain first..."},
-                status_code=400,
-            )
-
-        if not file_ids:
-            return JSONResponse(
-                content={"message": "You didn't select any files..."},
-                status_code=400,
-            )
-
-        with Database() as db:
-            update_result = db.update_session_info(user_id=userID, session_id=sessionID)
-
-            if not update_result["success"]:
-                return JSONResponse(
-                    content={"message": update_result["message"]},
-                    status_code=400,
-                )
-
-        # Get required data from Redis
-        index, filtered_content, boost_info, index_header = processor.filter_search(
-            domain_content=redis_manager.get_data(f"user:{userID}:domain_content"),
-            domain_embeddings=redis_manager.get_data(
-                f"user:{userID}:domain_embeddings"
-            ),
-            file_ids=file_ids,
+        question, early_response = await prepare_question(
+            user_id=userID,
+            session_id=sessionID,
+            user_message=data.get("user_message"),
+            file_ids=data.get("file_ids"),
         )
+        if early_response:
+            QA_REQUESTS.labels("generate_answer", "rejected").inc()
+            return early_response
 
-        if not index or not filtered_content:
+        if question["cached_answer"]:
+            QA_REQUESTS.labels("generate_answer", "cached").inc()
+            redis_manager.refresh_user_ttl(userID)
             return JSONResponse(
-                content={"message": "Nothing in here..."},
-                status_code=400,
+                content={
+                    **question["cached_answer"],
+                    "question_count": question["question_count"],
+                },
+                status_code=200,
             )
 
         # Process search
-        answer, resources, resource_sentences = processor.search_index(
-            user_query=user_message,
-            domain_content=filtered_content,
-            boost_info=boost_info,
-            index=index,
-            index_header=index_header,
-        )
+        answer, resources, resource_sentences = await search_question(question=question)
 
         if not resources or not resource_sentences:
+            QA_REQUESTS.labels("generate_answer", "no_answer").inc()
             return JSONResponse(
                 content={"message": answer},
                 status_code=200,
             )
 
+        cache_answer(
+            question=question,
+            answer=answer,
+            resources=resources,
+            resource_sentences=resource_sentences,
+        )
         redis_manager.refresh_user_ttl(userID)
 
+        QA_REQUESTS.labels("generate_answer", "answered").inc()
         return JSONResponse(
             content={
                 "answer": answer,
                 "resources": resources,
                 "resource_sentences": resource_sentences,
-                "question_count": update_result["question_count"],
+                "question_count": question["question_count"],
             },
             status_code=200,
         )
 
     except RedisConnectionError as e:
+        QA_REQUESTS.labels("generate_answer", "error").inc()
         logger.error(f"Redis connection error: {str(e)}")
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
     except Exception as e:
+        QA_REQUESTS.labels("generate_answer", "error").inc()
         logger.error(f"Error in generate_answer: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/qa/generate_answer_stream")
+async def generate_answer_stream(
+    request: Request,
+    userID: str = Query(...),
+    sessionID: str = Query(...),
+):
+    try:
+        data = await request.json()
+        question, early_response = await prepare_question(
+            user_id=userID,
+            session_id=sessionID,
+            user_message=data.get("user_message"),
+            file_ids=data.get("file_ids"),
+        )
+        if early_response:
+            QA_REQUESTS.labels("generate_answer_stream", "rejected").inc()
+            return early_response
+
+        if question["cached_answer"]:
+            QA_REQUESTS.labels("generate_answer_stream", "cached").inc()
+            answer = cached_tokens(question["cached_answer"]["answer"])
+            resources = question["cached_answer"]["resources"]
+            resource_sentences = question["cached_answer"]["resource_sentences"]
+        else:
+            # Answer tokens are only requested while the response streams
+            answer, resources, resource_sentences = await search_question(
+                question=question, stream=True
+            )
+
+            if not resources or not resource_sentences:
+                QA_REQUESTS.labels("generate_answer_stream", "no_answer").inc()
+                return JSONResponse(
+                    content={"message": answer},
+                    status_code=200,
+                )
+            QA_REQUESTS.labels("generate_answer_stream", "answered").inc()
+
+        redis_manager.refresh_user_ttl(userID)
+
+        return StreamingResponse(
+            answer_events(
+                question=question,
+                answer_tokens=answer,
+                resources=resources,
+                resource_sentences=resource_sentences,
+            ),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except RedisConnectionError as e:
+        QA_REQUESTS.labels("generate_answer_stream", "error").inc()
+        logger.error(f"Redis connection error: {str(e)}")
+        raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    except Exception as e:
+        QA_REQUESTS.labels("generate_answer_stream", "error").inc()
+        logger.error(f"Error in generate_answer_stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/io/store_file")
 async def store_file(
     userID: str = Query(...),
@@ -344,41 +409,31 @@ async def store_file(
                 status_code=400,
             )
 
-        file_data = processor.rf.read_file(
-            file_bytes=file_bytes, file_name=file.filename
-        )
-
-        if not file_data["sentences"]:
+        # Payloads are kept in Redis until a worker takes the job
+        if len(file_bytes) > processor.rf.max_file_size_mb * 1024 * 1024:
             return JSONResponse(
                 content={
-                    "message": f"No content to extract in {file.filename}. If there is please report this to us!"
+                    "message": f"File size exceeds {processor.rf.max_file_size_mb}MB limit"
                 },
                 status_code=400,
             )
 
-        # Create embeddings
-        file_embeddings = processor.ef.create_embeddings_from_sentences(
-            sentences=file_data["sentences"]
+        # Parsing and embedding run in ingestion workers
+        job_id = ingestion_queue.enqueue(
+            user_id=userID,
+            kind="file",
+            file_name=file.filename,
+            params={"last_modified": lastModified},
+            payload=file_bytes,
+            profile_id=current_profile_id.get(),
         )
 
-        # Store in Redis
-        redis_key = f"user:{userID}:upload:{file.filename}"
-        upload_data = {
-            "file_name": file.filename,
-            "last_modified": datetime.fromtimestamp(int(lastModified) / 1000).strftime(
-                "%Y-%m-%d"
-            )[:20],
-            "sentences": file_data["sentences"],
-            "page_numbers": file_data["page_number"],
-            "is_headers": file_data["is_header"],
-            "is_tables": file_data["is_table"],
-            "embeddings": file_embeddings,
-        }
-
-        redis_manager.set_data(redis_key, upload_data, expiry=3600)
-
         return JSONResponse(
-            content={"message": "success", "file_name": file.filename},
+            content={
+                "message": "success",
+                "file_name": file.filename,
+                "job_id": job_id,
+            },
             status_code=200,
         )
 
@@ -398,95 +453,26 @@ async def store_drive_file(
     accessToken: str = Form(...),
 ):
     try:
-        credentials = Credentials(
-            token=accessToken,
-            client_id=GOOGLE_CLIENT_ID,
-            client_secret=GOOGLE_CLIENT_SECRET,
-            token_uri="https://oauth2.googleapis.com/token",
-        )
-
-        drive_service = build("drive", "v3", credentials=credentials)
-
-        google_mime_types = {
-            "application/vnd.google-apps.document": ("application/pdf", ".pdf"),
-            "application/vnd.google-apps.spreadsheet": (
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ".xlsx",
-            ),
-            "application/vnd.google-apps.presentation": (
-                "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                ".pptx",
-            ),
-            "application/vnd.google-apps.script": ("text/plain", ".txt"),
-        }
-
-        file_metadata = (
-            drive_service.files().get(fileId=driveFileId, fields="mimeType").execute()
-        )
-        mime_type = file_metadata["mimeType"]
-
-        if mime_type in google_mime_types:
-            export_mime_type, extension = google_mime_types[mime_type]
-            request = drive_service.files().export_media(
-                fileId=driveFileId, mimeType=export_mime_type
-            )
-
-            if not driveFileName.endswith(extension):
-                driveFileName += extension
-        else:
-            request = drive_service.files().get_media(fileId=driveFileId)
-
-        file_stream = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_stream, request)
-
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-
-        file_stream.seek(0)
-        file_bytes = file_stream.read()
-
-        if not file_bytes:
-            return JSONResponse(
-                content={
-                    "message": f"Empty file {driveFileName}. If you think not, please report this to us!"
-                },
-                status_code=400,
-            )
-
-        file_data = processor.rf.read_file(
-            file_bytes=file_bytes, file_name=driveFileName
-        )
-
-        if not file_data["sentences"]:
-            return JSONResponse(
-                content={
-                    "message": f"No content to extract in {driveFileName}. If there is please report this to us!"
-                },
-                status_code=400,
-            )
-
-        file_embeddings = processor.ef.create_embeddings_from_sentences(
-            sentences=file_data["sentences"]
+        # Download, parsing and embedding run in ingestion workers
+        job_id = ingestion_queue.enqueue(
+            user_id=userID,
+            kind="drive",
+            file_name=driveFileName,
+            params={
+                "last_modified": lastModified,
+                "drive_file_id": driveFileId,
+                "access_token": accessToken,
+            },
+            profile_id=current_profile_id.get(),
         )
 
-        redis_key = f"user:{userID}:upload:{driveFileName}"
-        upload_data = {
-            "file_name": driveFileName,
-            "last_modified": datetime.fromtimestamp(int(lastModified) / 1000).strftime(
-                "%Y-%m-%d"
-            )[:20],
-            "sentences": file_data["sentences"],
-            "page_numbers": file_data["page_number"],
-            "is_headers": file_data["is_header"],
-            "is_tables": file_data["is_table"],
-            "embeddings": file_embeddings,
-        }
-
-        redis_manager.set_data(redis_key, upload_data, expiry=3600)
-
         return JSONResponse(
-            content={"message": "success", "file_name": driveFileName}, status_code=200
+            content={
+                "message": "success",
+                "file_name": driveFileName,
+                "job_id": job_id,
+            },
+            status_code=200,
         )
 
     except Exception as e:
@@ -505,42 +491,18 @@ async def store_url(userID: str = Query(...), url: str = Form(...)):
                 status_code=400,
             )
 
-        html = processor.ws.request_creator(url)
-        if not html:
-            return JSONResponse(
-                content={"message": "Error fetching the URL. Please try again later."},
-                status_code=400,
-            )
-
-        file_data = processor.rf.read_url(html_content=html)
-
-        if not file_data["sentences"]:
-            return JSONResponse(
-                content={
-                    "message": f"No content to extract in {url}. If there is please report this to us!"
-                },
-                status_code=400,
-            )
-
-        file_embeddings = processor.ef.create_embeddings_from_sentences(
-            sentences=file_data["sentences"]
+        # Fetching, parsing and embedding run in ingestion workers
+        job_id = ingestion_queue.enqueue(
+            user_id=userID,
+            kind="url",
+            file_name=url,
+            params={},
+            profile_id=current_profile_id.get(),
         )
 
-        redis_key = f"user:{userID}:upload:{url}"
-        upload_data = {
-            "file_name": url,
-            "last_modified": datetime.now().strftime("%Y-%m-%d"),
-            "sentences": file_data["sentences"],
-            "page_numbers": file_data["page_number"],
-            "is_headers": file_data["is_header"],
-            "is_tables": file_data["is_table"],
-            "embeddings": file_embeddings,
-        }
-
-        redis_manager.set_data(redis_key, upload_data, expiry=3600)
-
         return JSONResponse(
-            content={"message": "success", "file_name": url}, status_code=200
+            content={"message": "success", "file_name": url, "job_id": job_id},
+            status_code=200,
         )
 
     except Exception as e:
@@ -550,6 +512,27 @@ async def store_url(userID: str = Query(...), url: str = Form(...)):
         )
 
 
+@router.get("/io/ingestion_status")
+async def ingestion_status(userID: str = Query(...), jobIDs: str = Query(...)):
+    try:
+        jobs = []
+        for job_id in jobIDs.split(","):
+            status = ingestion_queue.get_status(job_id=job_id, user_id=userID)
+            jobs.append(status or {"job_id": job_id, "status": "unknown"})
+
+        return JSONResponse(
+            content={"message": "success", "jobs": jobs},
+            status_code=200,
+        )
+
+    except RedisConnectionError as e:
+        logger.error(f"Redis connection error: {str(e)}")
+        raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    except Exception as e:
+        logger.error(f"Error in ingestion_status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/io/upload_files")
 async def upload_files(userID: str = Query(...)):
     try:
@@ -592,6 +575,7 @@ async def upload_files(userID: str = Query(...)):
                         selected_domain_id,
                         upload_data["file_name"],
                         upload_data["last_modified"],
+                        upload_data.get("file_lang"),
                     )
                 )
 
@@ -620,8 +604,10 @@ async def upload_files(userID: str = Query(...)):
                 )
             db.conn.commit()
 
+        answer_cache.invalidate_domain(selected_domain_id)
+
         # Update domain info
-        file_names, file_ids, success = update_selected_domain(
+        file_names, file_ids, success = await update_selected_domain(
             user_id=userID, domain_id=selected_domain_id
         )
         if not success:
@@ -671,7 +657,11 @@ async def remove_file_upload(
                 )
             db.conn.commit()
 
-        _, _, success = update_selected_domain(user_id=userID, domain_id=domain_id)
+        answer_cache.invalidate_domain(domain_id)
+
+        _, _, success = await update_selected_domain(
+            user_id=userID, domain_id=domain_id
+        )
         if not success:
             return JSONResponse(
                 content={"message": "error"},
@@ -994,42 +984,446 @@ async def google_callback(request: Request):
 
 
 # local functions
-def update_selected_domain(user_id: str, domain_id: str):
+
+
+def start_ingestion_workers():
+    """Start ingestion workers on the running event loop"""
+    for _ in range(INGESTION_WORKERS):
+        ingestion_tasks.append(
+            asyncio.create_task(
+                ingestion_queue.run_worker(
+                    handler=process_ingestion_job, stop_event=ingestion_stop
+                )
+            )
+        )
+
+
+async def stop_ingestion_workers():
+    """Let workers finish their current job, unfinished jobs stay queued"""
+    ingestion_stop.set()
+    await asyncio.gather(*ingestion_tasks, return_exceptions=True)
+    ingestion_tasks.clear()
+    processor.rf.shutdown()
+
+
+async def process_ingestion_job(job: dict, payload: bytes):
+    """Fetch, parse and embed a file, then stage it in Redis for upload_files"""
+    job_id = job["job_id"]
+    params = job["params"]
+    file_name = job["file_name"]
+
+    if job["kind"] == "drive":
+        ingestion_queue.update_stage(job_id, "fetching")
+        file_bytes, file_name = await asyncio.to_thread(
+            download_drive_file,
+            access_token=params["access_token"],
+            drive_file_id=params["drive_file_id"],
+            drive_file_name=file_name,
+        )
+        if not file_bytes:
+            raise IngestionError(
+                f"Empty file {file_name}. If you think not, please report this to us!"
+            )
+    elif job["kind"] == "url":
+        ingestion_queue.update_stage(job_id, "fetching")
+        html = await asyncio.to_thread(processor.ws.request_creator, file_name)
+        if not html:
+            raise ValueError("Error fetching the URL. Please try again later.")
+    else:
+        file_bytes = payload
+
+    ingestion_queue.update_stage(job_id, "parsing")
+    try:
+        if job["kind"] == "url":
+            file_data = await processor.rf.read_url(
+                html_content=html, profile_id=job.get("profile_id")
+            )
+        else:
+            file_data = await processor.rf.read_file(
+                file_bytes=file_bytes,
+                file_name=file_name,
+                profile_id=job.get("profile_id"),
+            )
+    except ValueError as e:
+        # Unsupported or broken files fail the same way on every attempt
+        raise IngestionError(str(e))
+
+    if not file_data["sentences"]:
+        raise IngestionError(
+            f"No content to extract in {file_name}. If there is please report this to us!"
+        )
+
+    ingestion_queue.update_stage(job_id, "embedding")
+    file_embeddings = await processor.ef.create_embeddings_from_sentences(
+        sentences=file_data["sentences"]
+    )
+
+    ingestion_queue.update_stage(job_id, "staging")
+    if job["kind"] == "url":
+        last_modified = datetime.now().strftime("%Y-%m-%d")
+    else:
+        last_modified = datetime.fromtimestamp(
+            int(params["last_modified"]) / 1000
+        ).strftime("%Y-%m-%d")[:20]
+
+    upload_data = {
+        "file_name": file_name,
+        "last_modified": last_modified,
+        "sentences": file_data["sentences"],
+        "page_numbers": file_data["page_number"],
+        "is_headers": file_data["is_header"],
+        "is_tables": file_data["is_table"],
+        "embeddings": file_embeddings,
+        "file_lang": processor.file_lang_detection(sentences=file_data["sentences"]),
+    }
+
+    redis_manager.set_data(
+        f"user:{job['user_id']}:upload:{file_name}", upload_data, expiry=3600
+    )
+
+
+def download_drive_file(access_token: str, drive_file_id: str, drive_file_name: str):
+    credentials = Credentials(
+        token=access_token,
+        client_id=GOOGLE_CLIENT_ID,
+        client_secret=GOOGLE_CLIENT_SECRET,
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+
+    drive_service = build("drive", "v3", credentials=credentials)
+
+    google_mime_types = {
+        "application/vnd.google-apps.document": ("application/pdf", ".pdf"),
+        "application/vnd.google-apps.spreadsheet": (
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ".xlsx",
+        ),
+        "application/vnd.google-apps.presentation": (
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            ".pptx",
+        ),
+        "application/vnd.google-apps.script": ("text/plain", ".txt"),
+    }
+
+    file_metadata = (
+        drive_service.files().get(fileId=drive_file_id, fields="mimeType").execute()
+    )
+    mime_type = file_metadata["mimeType"]
+
+    if mime_type in google_mime_types:
+        export_mime_type, extension = google_mime_types[mime_type]
+        request = drive_service.files().export_media(
+            fileId=drive_file_id, mimeType=export_mime_type
+        )
+
+        if not drive_file_name.endswith(extension):
+            drive_file_name += extension
+    else:
+        request = drive_service.files().get_media(fileId=drive_file_id)
+
+    file_stream = io.BytesIO()
+    downloader = MediaIoBaseDownload(file_stream, request)
+
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+
+    file_stream.seek(0)
+    return file_stream.read(), drive_file_name
+
+
+async def update_selected_domain(user_id: str, domain_id: str):
     try:
         redis_manager.set_data(f"user:{user_id}:selected_domain", domain_id)
 
         with Database() as db:
             file_info = db.get_file_info_with_domain(user_id, domain_id)
-
-            if not file_info:
-                # Clear any existing domain data
-                redis_manager.delete_data(f"user:{user_id}:domain_content")
-                redis_manager.delete_data(f"user:{user_id}:index")
-                redis_manager.delete_data(f"user:{user_id}:index_header")
-                redis_manager.delete_data(f"user:{user_id}:boost_info")
-                return None, None, 1
-
-            content, embeddings = db.get_file_content(
-                file_ids=[info["file_id"] for info in file_info]
+            content, embeddings = (
+                db.get_file_content(file_ids=[info["file_id"] for info in file_info])
+                if file_info
+                else (None, None)
             )
 
-            if not content or not len(embeddings):
-                # Clear any existing domain data
-                redis_manager.delete_data(f"user:{user_id}:domain_content")
-                redis_manager.delete_data(f"user:{user_id}:index")
-                redis_manager.delete_data(f"user:{user_id}:index_header")
-                redis_manager.delete_data(f"user:{user_id}:boost_info")
-                return None, None, 0
+        if not file_info or not content or not len(embeddings):
+            # Clear any existing domain data
+            redis_manager.delete_data(f"user:{user_id}:domain_content")
+            redis_manager.delete_data(f"user:{user_id}:index")
+            redis_manager.delete_data(f"user:{user_id}:index_header")
+            redis_manager.delete_data(f"user:{user_id}:boost_info")
+            redis_manager.delete_data(f"user:{user_id}:domain_version")
+            redis_manager.delete_data(f"user:{user_id}:file_langs")
+            index_cache.invalidate_domain(domain_id)
+            return None, None, 0 if file_info else 1
+
+        file_names = [info["file_name"] for info in file_info]
+        file_ids = [info["file_id"] for info in file_info]
+        domain_version = index_cache.content_version(
+            file_ids=file_ids, sentence_amount=len(content)
+        )
 
-            # Store domain content in Redis
-            redis_manager.set_data(f"user:{user_id}:domain_content", content)
-            redis_manager.set_data(f"user:{user_id}:domain_embeddings", embeddings)
+        # Store domain content in Redis
+        redis_manager.set_data(f"user:{user_id}:domain_content", content)
+        redis_manager.set_array(f"user:{user_id}:domain_embeddings", embeddings)
+        redis_manager.set_data(f"user:{user_id}:domain_version", domain_version)
+        redis_manager.set_data(
+            f"user:{user_id}:file_langs",
+            {info["file_id"]: info["file_lang"] for info in file_info},
+        )
 
-            file_names = [info["file_name"] for info in file_info]
-            file_ids = [info["file_id"] for info in file_info]
+        # Build domain-wide indexes once per content version, file selection
+        # is applied per question
+        await index_cache.get_or_build(
+            index_cache.make_key(domain_id, domain_version),
+            build=partial(
+                build_search_data,
+                user_id=user_id,
+                domain_version=domain_version,
+                domain_content=content,
+                domain_embeddings=embeddings,
+            ),
+            size_of=processor.search_data_size,
+        )
 
-            return file_names, file_ids, 1
+        return file_names, file_ids, 1
 
     except Exception as e:
         logger.error(f"Error in update_selected_domain: {str(e)}")
         raise RedisConnectionError(f"Failed to update domain: {str(e)}")
+
+
+async def get_search_data(user_id: str, domain_id: str):
+    domain_version = redis_manager.get_data(f"user:{user_id}:domain_version")
+    if domain_version:
+        search_data = index_cache.get(index_cache.make_key(domain_id, domain_version))
+        if search_data:
+            return search_data
+
+    domain_content = redis_manager.get_data(f"user:{user_id}:domain_content")
+    domain_embeddings = redis_manager.get_array(f"user:{user_id}:domain_embeddings")
+    if not domain_content or domain_embeddings is None:
+        return None
+
+    build = partial(
+        build_search_data,
+        user_id=user_id,
+        domain_version=domain_version,
+        domain_content=domain_content,
+        domain_embeddings=domain_embeddings,
+    )
+    if not domain_version:
+        return await build()
+
+    # Cold build after a restart or eviction, shared by concurrent questions
+    return await index_cache.get_or_build(
+        index_cache.make_key(domain_id, domain_version),
+        build=build,
+        size_of=processor.search_data_size,
+    )
+
+
+async def build_search_data(
+    user_id: str,
+    domain_version: str,
+    domain_content: list,
+    domain_embeddings,
+):
+    # Index builds take seconds on large domains, keep the loop free
+    search_data = await asyncio.to_thread(
+        processor.create_search_data,
+        domain_content=domain_content,
+        domain_embeddings=domain_embeddings,
+        boost_info=get_boost_info(user_id, domain_version),
+    )
+    if domain_version:
+        redis_manager.set_data(
+            f"user:{user_id}:boost_info",
+            {
+                "domain_version": domain_version,
+                "boost_info": search_data["boost_info"],
+            },
+        )
+    return search_data
+
+
+def get_boost_info(user_id: str, domain_version: str):
+    """Boost info precomputed for the domain version, if still in Redis"""
+    stored_boost_info = redis_manager.get_data(f"user:{user_id}:boost_info")
+    if (
+        domain_version
+        and stored_boost_info
+        and stored_boost_info["domain_version"] == domain_version
+    ):
+        return stored_boost_info["boost_info"]
+    return None
+
+
+async def prepare_question(
+    user_id: str, session_id: str, user_message: str, file_ids: list
+):
+    """Checks shared by answer endpoints, returns question state or an early response"""
+    # Check if domain is selected
+    selected_domain_id = redis_manager.get_data(f"user:{user_id}:selected_domain")
+    if not selected_domain_id:
+        return None, JSONResponse(
+            content={"message": "Please select a domain first..."},
+            status_code=400,
+        )
+
+    if not file_ids:
+        return None, JSONResponse(
+            content={"message": "You didn't select any files..."},
+            status_code=400,
+        )
+
+    with Database() as db, stage_timer("quota_update"):
+        update_result = db.update_session_info(user_id=user_id, session_id=session_id)
+
+        if not update_result["success"]:
+            return None, JSONResponse(
+                content={"message": update_result["message"]},
+                status_code=400,
+            )
+
+    question = {
+        "user_id": user_id,
+        "user_message": user_message,
+        "file_ids": file_ids,
+        "question_count": update_result["question_count"],
+        "answer_cache_key": None,
+        "question_embedding": None,
+        "cached_answer": None,
+    }
+
+    # Same question over the same files and domain content is answered once
+    domain_version = redis_manager.get_data(f"user:{user_id}:domain_version")
+    if answer_cache.enabled and domain_version:
+        question["answer_cache_key"] = answer_cache.make_key(
+            domain_id=selected_domain_id,
+            domain_version=domain_version,
+            file_ids=file_ids,
+        )
+        if answer_cache.similarity_threshold > 0:
+            question_embeddings = await processor.ef.create_query_embeddings(
+                queries=[user_message]
+            )
+            question["question_embedding"] = question_embeddings[0]
+        question["cached_answer"] = answer_cache.get(
+            question["answer_cache_key"],
+            question=user_message,
+            question_embedding=question["question_embedding"],
+        )
+        if question["cached_answer"]:
+            return question, None
+
+    # Get search data from index cache or Redis
+    with stage_timer("redis_fetch"):
+        search_data = await get_search_data(
+            user_id=user_id, domain_id=selected_domain_id
+        )
+    with stage_timer("filter_search"):
+        selection = (
+            processor.filter_search(
+                boost_info=search_data["boost_info"], file_ids=file_ids
+            )
+            if search_data
+            else None
+        )
+
+    if not selection:
+        return None, JSONResponse(
+            content={"message": "Nothing in here..."},
+            status_code=400,
+        )
+
+    question["search_data"] = search_data
+    question["selection"] = selection
+    return question, None
+
+
+async def search_question(question: dict, stream: bool = False):
+    user_id = question["user_id"]
+    search_data = question["search_data"]
+
+    # Quantized indexes re-rank candidates with full precision rows
+    embedding_loader = None
+    if processor.indf.quantization != "none":
+        embedding_loader = partial(
+            redis_manager.get_array_rows, f"user:{user_id}:domain_embeddings"
+        )
+
+    # Language of selected files is detected once at ingestion
+    file_langs = redis_manager.get_data(f"user:{user_id}:file_langs") or {}
+    file_lang = processor.majority_file_lang(
+        file_langs=file_langs, file_ids=question["file_ids"]
+    )
+
+    return await processor.search_index(
+        user_query=question["user_message"],
+        domain_content=search_data["domain_content"],
+        boost_info=search_data["boost_info"],
+        index=search_data["index"],
+        index_header=search_data["index_header"],
+        selection=question["selection"],
+        embedding_loader=embedding_loader,
+        file_lang=file_lang,
+        stream=stream,
+    )
+
+
+def cache_answer(
+    question: dict, answer: str, resources: dict, resource_sentences: list
+):
+    if not question["answer_cache_key"] or question["cached_answer"]:
+        return
+
+    answer_cache.put(
+        question["answer_cache_key"],
+        question=question["user_message"],
+        answer={
+            "answer": answer,
+            "resources": resources,
+            "resource_sentences": resource_sentences,
+        },
+        question_embedding=question["question_embedding"],
+    )
+
+
+async def answer_events(
+    question: dict, answer_tokens, resources: dict, resource_sentences
+):
+    """Server-sent events with resources first, then answer tokens as generated"""
+    yield sse_event(
+        "resources",
+        {
+            "resources": resources,
+            "resource_sentences": resource_sentences,
+            "question_count": question["question_count"],
+        },
+    )
+
+    answer = ""
+    try:
+        async for token in answer_tokens:
+            answer += token
+            yield sse_event("token", {"token": token})
+    except Exception as e:
+        logger.error(f"Error streaming answer: {str(e)}")
+        yield sse_event("error", {"message": "Error generating message!"})
+        return
+
+    answer = answer.strip()
+    cache_answer(
+        question=question,
+        answer=answer,
+        resources=resources,
+        resource_sentences=resource_sentences,
+    )
+    yield sse_event("done", {"answer": answer})
+
+
+async def cached_tokens(answer: str):
+    yield answer
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -154,7 +154,7 @@ class Database:
 
     def get_file_info_with_domain(self, user_id: str, domain_id: str):
         query_get_file_info = """
-        SELECT DISTINCT file_id, file_name, file_modified_date, file_upload_date
+        SELECT DISTINCT file_id, file_name, file_modified_date, file_upload_date, file_lang
         FROM file_info
         WHERE user_id = %s AND domain_id = %s
         """
@@ -174,6 +174,7 @@ class Database:
                         "file_name": row[1],
                         "file_modified_date": row[2],
                         "file_upload_date": row[3],
+                        "file_lang": row[4],
                     }
                     for row in data
                 ]
@@ -210,9 +211,10 @@ class Database:
         FROM file_content t1
         LEFT JOIN file_info t2 ON t1.file_id = t2.file_id
         WHERE t1.file_id IN %s
+        ORDER BY t1.content_id
         """
         query_get_embeddings = """
-        SELECT array_agg(embedding) AS embeddings
+        SELECT array_agg(embedding ORDER BY content_id) AS embeddings
         FROM file_content
         WHERE file_id IN %s
         """
@@ -544,7 +546,7 @@ class Database:
     def _insert_file_info_batch(self, file_info_batch: list):
         """Internal method for file info insertion."""
         query = """
-        INSERT INTO file_info (user_id, file_id, domain_id, file_name, file_modified_date)
+        INSERT INTO file_info (user_id, file_id, domain_id, file_name, file_modified_date, file_lang)
         VALUES %s
         """
         try:
@@ -38,10 +38,13 @@ CREATE TABLE IF NOT EXISTS file_info (
     file_name VARCHAR(255) NOT NULL,
     file_modified_date DATE,
     file_upload_date DATE DEFAULT CURRENT_DATE,
+    file_lang VARCHAR(10),
     FOREIGN KEY (user_id) REFERENCES user_info(user_id),
     FOREIGN KEY (domain_id) REFERENCES domain_info(domain_id)
 );
 
+ALTER TABLE file_info ADD COLUMN IF NOT EXISTS file_lang VARCHAR(10);
+
 CREATE TABLE IF NOT EXISTS file_content (
     content_id SERIAL PRIMARY KEY,
     file_id UUID NOT NULL,
@@ -53,6 +56,12 @@ CREATE TABLE IF NOT EXISTS file_content (
     FOREIGN KEY (file_id) REFERENCES file_info(file_id)
 );
 
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash BYTEA PRIMARY KEY,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS session_info (
     id SERIAL PRIMARY KEY,
     user_id UUID NOT NULL,
@@ -0,0 +1,234 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, List
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings, optionally shared between workers by Redis"""
+
+    def __init__(self, max_entries: int = None, redis_manager=None):
+        self.max_entries = max_entries or int(
+            os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096)
+        )
+        self.redis_expiry = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", 86400))
+        self.redis_manager = redis_manager
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode, case and whitespace variants of a query map to the same key"""
+        text = unicodedata.normalize("NFKC", text)
+        return " ".join(text.split()).lower()
+
+    @classmethod
+    def make_key(cls, model: str, text: str) -> str:
+        payload = f"{model}:{cls.normalize(text)}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+        if self.redis_manager:
+            embedding = self._get_shared(key)
+            if embedding is not None:
+                self._put_local(key, embedding)
+                with self._lock:
+                    self.hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        self._put_local(key, embedding)
+        if self.redis_manager:
+            self._put_shared(key, embedding)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _put_local(self, key: str, embedding: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str) -> Optional[np.ndarray]:
+        # Shared cache is best effort, a Redis failure is a cache miss
+        try:
+            return self.redis_manager.get_data(f"embedding:query:{key}")
+        except Exception as e:
+            logger.warning(f"Shared query embedding cache unavailable: {str(e)}")
+            return None
+
+    def _put_shared(self, key: str, embedding: np.ndarray) -> None:
+        try:
+            self.redis_manager.set_data(
+                f"embedding:query:{key}", embedding, expiry=self.redis_expiry
+            )
+        except Exception as e:
+            logger.warning(f"Shared query embedding cache unavailable: {str(e)}")
+
+
+class SentenceEmbeddingCache:
+    """Persistent embeddings of exact sentence texts, in Postgres or a local file"""
+
+    # Keys per lookup query, below the SQLite host parameter limit
+    chunk_size = 500
+
+    def __init__(self, backend: str = None, path: str = None):
+        self.backend = (
+            backend or os.getenv("SENTENCE_EMBEDDING_CACHE", "postgres")
+        ).lower()
+        self.path = path or os.getenv(
+            "SENTENCE_EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3"
+        )
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        # Exact text, any change in the sentence is a different embedding
+        payload = f"{model}\0{text}"
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    def get_many(self, keys: List[bytes]) -> dict:
+        """Cached embeddings of the given keys, missing keys are left out"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        if self.backend not in ("postgres", "disk") or not unique_keys:
+            return found
+        try:
+            # One connection serves every chunk of the lookup
+            with self._connection() as conn:
+                for i in range(0, len(unique_keys), self.chunk_size):
+                    chunk = unique_keys[i : i + self.chunk_size]
+                    for key, value in self._select(conn, chunk):
+                        found[bytes(key)] = np.frombuffer(
+                            bytes(value), dtype=np.float16
+                        )
+        except Exception as e:
+            # Cache is best effort, a failing store only costs API calls
+            logger.warning(f"Sentence embedding cache unavailable: {str(e)}")
+            found = {}
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, embeddings: dict) -> None:
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float16).tobytes())
+            for key, embedding in embeddings.items()
+        ]
+        if self.backend not in ("postgres", "disk") or not rows:
+            return
+        try:
+            with self._connection() as conn:
+                self._insert(conn, rows)
+        except Exception as e:
+            logger.warning(f"Sentence embedding cache unavailable: {str(e)}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.backend, "hits": self.hits, "misses": self.misses}
+
+    @contextmanager
+    def _connection(self):
+        """Connection of the backend, committed when the block succeeds"""
+        if self.backend == "postgres":
+            # Lookups run in worker threads, the Database singleton holds the
+            # connection of the event loop and must not be shared with them
+            import psycopg2
+            from .db.config import GenerateConfig
+
+            conn = psycopg2.connect(**GenerateConfig.config())
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                conn.close()
+        else:
+            with self._lock:
+                conn = self._get_connection()
+                yield conn
+                conn.commit()
+
+    def _select(self, conn, keys: List[bytes]) -> list:
+        if self.backend == "postgres":
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT content_hash, embedding FROM embedding_cache "
+                    "WHERE content_hash IN %s",
+                    (tuple(keys),),
+                )
+                return cursor.fetchall()
+        placeholders = ",".join("?" * len(keys))
+        return conn.execute(
+            "SELECT content_hash, embedding FROM embedding_cache "
+            f"WHERE content_hash IN ({placeholders})",
+            keys,
+        ).fetchall()
+
+    def _insert(self, conn, rows: list) -> None:
+        if self.backend == "postgres":
+            from psycopg2 import extras
+
+            with conn.cursor() as cursor:
+                extras.execute_values(
+                    cursor,
+                    "INSERT INTO embedding_cache (content_hash, embedding) "
+                    "VALUES %s ON CONFLICT (content_hash) DO NOTHING",
+                    rows,
+                )
+        else:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (content_hash, embedding) "
+                "VALUES (?, ?)",
+                rows,
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache "
+                "(content_hash BLOB PRIMARY KEY, embedding BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
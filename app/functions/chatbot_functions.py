@@ -1,4 +1,3 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 from langdetect import detect
 import textwrap
@@ -6,11 +5,14 @@ import yaml
 import re
 from typing import Dict, Any, Match
 
+from .openai_client import OpenAIClient
+from ..metrics import OPENAI_IN_FLIGHT
+
 
 class ChatbotFunctions:
     def __init__(self):
         load_dotenv()
-        self.client = OpenAI()
+        self.client = OpenAIClient().client
 
         with open("app/utils/prompts.yaml", "r", encoding="utf-8") as file:
             self.prompt_data = yaml.safe_load(file)
@@ -25,33 +27,55 @@ class ChatbotFunctions:
             self.get_prompt(category=intention, query=query, context=context, lang=lang)
         )
 
-    def response_generation(self, query, context, intention):
+    async def response_generation(self, query, context, intention):
         lang = self.detect_language(query=query)
         prompt = self._prompt_answer_generation(
             query=query, context=context, lang=lang, intention=intention
         )
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": query},
-            ],
-            temperature=0,
-        )
+        with OPENAI_IN_FLIGHT.labels("chat").track_inprogress():
+            response = await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": query},
+                ],
+                temperature=0,
+            )
         answer = response.choices[0].message.content.strip()
         return answer
 
-    def query_generation(self, query, file_lang):
+    async def response_generation_stream(self, query, context, intention):
         lang = self.detect_language(query=query)
-        prompt = self._prompt_query_generation(query, file_lang=file_lang)
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": query},
-            ],
-            temperature=0,
+        prompt = self._prompt_answer_generation(
+            query=query, context=context, lang=lang, intention=intention
         )
+        # Request is in flight until its last token arrives
+        with OPENAI_IN_FLIGHT.labels("chat").track_inprogress():
+            stream = await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": query},
+                ],
+                temperature=0,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def query_generation(self, query, file_lang):
+        lang = self.detect_language(query=query)
+        prompt = self._prompt_query_generation(query, file_lang=file_lang)
+        with OPENAI_IN_FLIGHT.labels("chat").track_inprogress():
+            response = await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": query},
+                ],
+                temperature=0,
+            )
         new_queries = response.choices[0].message.content.strip()
         return new_queries, lang
 
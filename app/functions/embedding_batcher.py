@@ -0,0 +1,135 @@
+from typing import List, Callable, Awaitable
+import asyncio
+import logging
+import os
+import random
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that grows on success and halves on rate limits"""
+
+    def __init__(self, initial: int, maximum: int, increase_after: int = 4):
+        self.limit = initial
+        self.maximum = maximum
+        self.increase_after = increase_after
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, rate_limited: bool = False):
+        async with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.increase_after and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class EmbeddingBatcher:
+    """Packs sentences into token-bounded requests and sends them concurrently"""
+
+    def __init__(
+        self,
+        rate_limit_errors: tuple = (),
+        retry_errors: tuple = (),
+    ):
+        self.max_batch_tokens = int(os.getenv("EMBEDDING_BATCH_TOKENS", 100000))
+        self.max_batch_inputs = int(os.getenv("EMBEDDING_BATCH_INPUTS", 2048))
+        self.concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", 4))
+        self.max_concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", 16))
+        self.max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", 6))
+        self.backoff = float(os.getenv("EMBEDDING_BACKOFF", 1))
+        self.rate_limit_errors = rate_limit_errors
+        self.retry_errors = retry_errors
+        # Shared by all embed calls, a rate limit slows every caller down
+        self._limiter = None
+        self._limiter_loop = None
+
+    @staticmethod
+    def estimate_tokens(sentence: str) -> int:
+        # About four characters per token for English text, rounded up
+        return len(sentence) // 4 + 1
+
+    def pack(self, sentences: List[str]) -> List[tuple]:
+        """Split sentences into (start, end) ranges within the request limits"""
+        batches = []
+        start, batch_tokens = 0, 0
+        for i, sentence in enumerate(sentences):
+            tokens = self.estimate_tokens(sentence)
+            if i > start and (
+                batch_tokens + tokens > self.max_batch_tokens
+                or i - start >= self.max_batch_inputs
+            ):
+                batches.append((start, i))
+                start, batch_tokens = i, 0
+            batch_tokens += tokens
+        if start < len(sentences):
+            batches.append((start, len(sentences)))
+        return batches
+
+    async def embed(
+        self,
+        sentences: List[str],
+        request: Callable[[List[str]], Awaitable[np.ndarray]],
+    ) -> np.ndarray:
+        """Embeddings of all sentences in input order"""
+        batches = self.pack(sentences)
+        limiter = self._get_limiter()
+
+        results = await asyncio.gather(
+            *[
+                self._send(sentences[start:end], request, limiter)
+                for start, end in batches
+            ]
+        )
+        return np.vstack(results)
+
+    def _get_limiter(self) -> AdaptiveLimiter:
+        """Limiter of the running loop, created on its first embed call"""
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter_loop is not loop:
+            self._limiter = AdaptiveLimiter(
+                initial=min(self.concurrency, self.max_concurrency),
+                maximum=self.max_concurrency,
+            )
+            self._limiter_loop = loop
+        return self._limiter
+
+    async def _send(self, batch: List[str], request, limiter: AdaptiveLimiter):
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                embeddings = await request(batch)
+            except self.rate_limit_errors + self.retry_errors as e:
+                rate_limited = isinstance(e, self.rate_limit_errors)
+                await limiter.release(rate_limited=rate_limited)
+                if attempt == self.max_retries:
+                    raise
+
+                delay = self.backoff * 2**attempt * (1 + random.random())
+                logger.warning(
+                    f"Embedding request failed ({type(e).__name__}), "
+                    f"retrying in {delay:.1f}s with concurrency {limiter.limit}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                await limiter.release()
+                raise
+
+            await limiter.release()
+            return embeddings
@@ -1,36 +1,74 @@
 import numpy as np
-from openai import OpenAI
+import asyncio
+import os
 from dotenv import load_dotenv
 from typing import List
 
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_providers import get_embedding_provider
+from ..embedding_cache import QueryEmbeddingCache, SentenceEmbeddingCache
+
 
 class EmbeddingFunctions:
     def __init__(self):
         load_dotenv()
-        self.client = OpenAI()
+        # EMBEDDING_PROVIDER=local embeds offline, without API keys or network
+        self.provider = get_embedding_provider()
+        self.model = self.provider.model
+
+        redis_manager = None
+        if os.getenv("QUERY_EMBEDDING_CACHE_REDIS", "false").lower() == "true":
+            from ..redis_manager import RedisManager
 
-    def create_embeddings_from_sentences(
-        self, sentences: List[str], chunk_size: int = 2000
+            redis_manager = RedisManager()
+        self.query_cache = QueryEmbeddingCache(redis_manager=redis_manager)
+        self.sentence_cache = SentenceEmbeddingCache()
+
+        self.batcher = EmbeddingBatcher(
+            rate_limit_errors=self.provider.rate_limit_errors,
+            retry_errors=self.provider.retry_errors,
+        )
+
+    async def create_embeddings_from_sentences(
+        self, sentences: List[str]
     ) -> List[np.ndarray]:
-        file_embeddings = []
-        for chunk_index in range(0, len(sentences), chunk_size):
-            chunk_embeddings = self.client.embeddings.create(
-                model="text-embedding-3-small",
-                input=sentences[chunk_index : chunk_index + chunk_size],
-            )
-            chunk_array = np.array(
-                [x.embedding for x in chunk_embeddings.data], dtype=np.float16
+        """Embeddings of sentences, only sentences missing from the cache reach the API"""
+        keys = [self.sentence_cache.make_key(self.model, s) for s in sentences]
+        embeddings = await asyncio.to_thread(self.sentence_cache.get_many, keys)
+
+        # Repeated sentences of a document are embedded once
+        missing = {}
+        for key, sentence in zip(keys, sentences):
+            if key not in embeddings:
+                missing.setdefault(key, sentence)
+
+        if missing:
+            missing_embeddings = await self.batcher.embed(
+                sentences=list(missing.values()), request=self.provider.embed
             )
-            file_embeddings.append(
-                chunk_array / np.linalg.norm(chunk_array, axis=1)[:, np.newaxis]
+            new_embeddings = dict(zip(missing.keys(), missing_embeddings))
+            await asyncio.to_thread(self.sentence_cache.put_many, new_embeddings)
+            embeddings.update(new_embeddings)
+
+        return np.vstack([embeddings[key] for key in keys])
+
+    async def create_query_embeddings(self, queries: List[str]) -> np.ndarray:
+        """Embeddings of queries, only uncached queries are sent to the API"""
+        keys = [self.query_cache.make_key(self.model, query) for query in queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # Queries stay out of the persistent sentence cache
+            missing_embeddings = await self.batcher.embed(
+                sentences=[queries[i] for i in missing],
+                request=self.provider.embed,
             )
+            for i, embedding in zip(missing, missing_embeddings):
+                self.query_cache.put(keys[i], embedding)
+                embeddings[i] = embedding
 
-        return np.vstack(file_embeddings)
+        return np.vstack(embeddings)
 
-    def create_embedding_from_sentence(self, sentence: list) -> np.ndarray:
-        query_embedding = self.client.embeddings.create(
-            model="text-embedding-3-small", input=sentence
-        )
-        return np.array(query_embedding.data[0].embedding, dtype=np.float16).reshape(
-            1, -1
-        )
+    async def create_embedding_from_sentence(self, sentence: list) -> np.ndarray:
+        return await self.provider.embed(sentences=sentence[:1])
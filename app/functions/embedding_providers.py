@@ -0,0 +1,94 @@
+from functools import lru_cache
+from typing import List
+import hashlib
+import os
+import re
+import numpy as np
+
+from ..metrics import OPENAI_IN_FLIGHT
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Unit length float16 rows, the form every provider returns"""
+    embeddings = np.asarray(embeddings, dtype=np.float16)
+    return embeddings / np.linalg.norm(embeddings, axis=1)[:, np.newaxis]
+
+
+class OpenAIEmbeddingProvider:
+    """Embeddings from the OpenAI API"""
+
+    name = "openai"
+    model = "text-embedding-3-small"
+    dimensions = 1536
+
+    def __init__(self):
+        from openai import (
+            RateLimitError,
+            APIConnectionError,
+            APITimeoutError,
+            InternalServerError,
+        )
+        from .openai_client import OpenAIClient
+
+        self.rate_limit_errors = (RateLimitError,)
+        self.retry_errors = (APIConnectionError, APITimeoutError, InternalServerError)
+        # Batcher backs off on rate limits itself, client retries would hide them
+        self.client = OpenAIClient().client.with_options(max_retries=0)
+
+    async def embed(self, sentences: List[str]) -> np.ndarray:
+        with OPENAI_IN_FLIGHT.labels("embeddings").track_inprogress():
+            embeddings = await self.client.embeddings.create(
+                model=self.model, input=sentences
+            )
+        return normalize_embeddings([x.embedding for x in embeddings.data])
+
+
+class LocalEmbeddingProvider:
+    """Deterministic offline embeddings for tests and benchmarks
+
+    A sentence is the sum of pseudo-random vectors seeded by its words, so
+    sentences sharing words stay close and search results remain meaningful.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        # Same size as the OpenAI embeddings so indexes and storage match
+        self.dimensions = int(os.getenv("EMBEDDING_DIMENSIONS", 1536))
+        self.model = f"local-hash-{self.dimensions}"
+        self.rate_limit_errors = ()
+        self.retry_errors = ()
+
+    async def embed(self, sentences: List[str]) -> np.ndarray:
+        return normalize_embeddings([self.embed_sentence(s) for s in sentences])
+
+    def embed_sentence(self, sentence: str) -> np.ndarray:
+        tokens = re.findall(r"\w+", sentence.lower()) or [sentence]
+        embedding = np.zeros(self.dimensions, dtype=np.float32)
+        for token in tokens:
+            embedding += self._token_vector(token, self.dimensions)
+        return embedding / np.linalg.norm(embedding)
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _token_vector(token: str, dimensions: int) -> np.ndarray:
+        seed = int.from_bytes(
+            hashlib.sha256(token.encode("utf-8")).digest()[:8], "little"
+        )
+        return np.random.default_rng(seed).standard_normal(dimensions, np.float32)
+
+
+providers = {
+    OpenAIEmbeddingProvider.name: OpenAIEmbeddingProvider,
+    LocalEmbeddingProvider.name: LocalEmbeddingProvider,
+}
+
+
+def get_embedding_provider(name: str = None):
+    """Embedding provider selected by EMBEDDING_PROVIDER, OpenAI by default"""
+    name = (name or os.getenv("EMBEDDING_PROVIDER", "openai")).lower()
+    if name not in providers:
+        raise ValueError(
+            f"Unknown embedding provider {name}, expected one of {list(providers)}"
+        )
+    return providers[name]()
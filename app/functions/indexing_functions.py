@@ -1,12 +1,139 @@
 import faiss
+import numpy as np
+import os
 
 
 class IndexingFunctions:
     def __init__(self):
-        pass
+        self.flat_max_sentences = int(os.getenv("INDEX_FLAT_MAX_SENTENCES", 50000))
+        self.hnsw_max_sentences = int(os.getenv("INDEX_HNSW_MAX_SENTENCES", 200000))
+        self.hnsw_m = int(os.getenv("INDEX_HNSW_M", 32))
+        self.hnsw_ef_construction = int(os.getenv("INDEX_HNSW_EF_CONSTRUCTION", 80))
+        self.hnsw_ef_search = int(os.getenv("INDEX_HNSW_EF_SEARCH", 128))
+        self.ivf_nprobe = int(os.getenv("INDEX_IVF_NPROBE", 16))
+        self.quantization = os.getenv("INDEX_QUANTIZATION", "none").lower()
+        self.pq_min_sentences = int(os.getenv("INDEX_PQ_MIN_SENTENCES", 10000))
+        self.pq_dimensions_per_code = int(os.getenv("INDEX_PQ_DIMENSIONS_PER_CODE", 16))
 
-    def create_flat_index(self, embeddings):
+    def select_index_type(self, sentence_amount: int) -> str:
+        """Exact search for small domains, approximate search for large ones"""
+        if sentence_amount < self.flat_max_sentences:
+            return "flat"
+        elif sentence_amount < self.hnsw_max_sentences:
+            return "hnsw"
+        return "ivf"
+
+    def create_flat_index(self, embeddings, quantization: str = "none"):
+        dimension = len(embeddings[0])
+        storage = self._storage_description(
+            dimension=dimension,
+            sentence_amount=len(embeddings),
+            quantization=quantization,
+        )
+        if storage == "Flat":
+            index = faiss.IndexFlatIP(dimension)
+        else:
+            index = faiss.index_factory(dimension, storage, faiss.METRIC_INNER_PRODUCT)
+            self._train(index=index, embeddings=embeddings)
+        index.add(np.asarray(embeddings, dtype=np.float32))
+        return index
+
+    def create_hnsw_index(self, embeddings, quantization: str = "none"):
         dimension = len(embeddings[0])
-        index = faiss.IndexFlatIP(dimension)
+        storage = self._storage_description(
+            dimension=dimension,
+            sentence_amount=len(embeddings),
+            quantization=quantization,
+        )
+        if storage == "Flat":
+            index = faiss.IndexHNSWFlat(
+                dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.index_factory(
+                dimension, f"HNSW{self.hnsw_m},{storage}", faiss.METRIC_INNER_PRODUCT
+            )
+            self._train(index=index, embeddings=embeddings)
+        index.hnsw.efConstruction = self.hnsw_ef_construction
+        index.hnsw.efSearch = self.hnsw_ef_search
+        index.add(np.asarray(embeddings, dtype=np.float32))
+        return index
+
+    def create_ivf_index(self, embeddings, quantization: str = "none"):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        dimension = embeddings.shape[1]
+        nlist = max(1, int(4 * np.sqrt(len(embeddings))))
+        storage = self._storage_description(
+            dimension=dimension,
+            sentence_amount=len(embeddings),
+            quantization=quantization,
+        )
+
+        index = faiss.index_factory(
+            dimension, f"IVF{nlist},{storage}", faiss.METRIC_INNER_PRODUCT
+        )
+        self._train(index=index, embeddings=embeddings, sample_amount=nlist * 64)
         index.add(embeddings)
+
+        index.nprobe = self.ivf_nprobe
+        index.make_direct_map()
         return index
+
+    def index_size(self, index) -> int:
+        """Approximate memory footprint of an index in bytes"""
+        if isinstance(index, faiss.IndexHNSW):
+            storage = faiss.downcast_index(index.storage)
+            # Level 0 keeps 2 * M neighbour ids per vector
+            return index.ntotal * (storage.code_size + 4 * index.hnsw.nb_neighbors(0))
+        elif isinstance(index, faiss.IndexIVF):
+            # Inverted list codes plus stored id and direct map entry per vector
+            return index.ntotal * (index.code_size + 16)
+        return index.ntotal * index.code_size
+
+    def _storage_description(
+        self, dimension: int, sentence_amount: int, quantization: str
+    ) -> str:
+        """Factory description of how vectors are stored inside an index"""
+        if quantization == "pq":
+            pq_m = dimension // self.pq_dimensions_per_code
+            if (
+                sentence_amount >= self.pq_min_sentences
+                and pq_m > 0
+                and dimension % pq_m == 0
+            ):
+                return f"PQ{pq_m}"
+            # Too few vectors to train product quantization codebooks
+            return "SQ8"
+        elif quantization == "sq8":
+            return "SQ8"
+        return "Flat"
+
+    def _train(self, index, embeddings, sample_amount: int = 100000):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        # Train on a sample, full data is not needed for good centroids
+        rng = np.random.default_rng(0)
+        sample_amount = min(len(embeddings), sample_amount)
+        sample = embeddings[rng.choice(len(embeddings), sample_amount, replace=False)]
+        index.train(sample)
+
+    def create_selector(self, mask: np.ndarray):
+        bitmap = np.packbits(mask, bitorder="little")
+        return faiss.IDSelectorBitmap(bitmap)
+
+    def search(self, index, query_vectors: np.ndarray, k: int, selector=None):
+        params = self._search_parameters(index=index, selector=selector)
+        return index.search(
+            np.asarray(query_vectors, dtype=np.float32), k, params=params
+        )
+
+    def _search_parameters(self, index, selector=None):
+        if isinstance(index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        elif isinstance(index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(
+                sel=selector, efSearch=index.hnsw.efSearch
+            )
+        elif selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
@@ -0,0 +1,36 @@
+import httpx
+import os
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+
+class OpenAIClient:
+    """Async OpenAI client, one connection pool is shared by all functions"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(OpenAIClient, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            load_dotenv()
+            timeout = httpx.Timeout(
+                float(os.getenv("OPENAI_TIMEOUT", 60)),
+                connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5)),
+            )
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", 100)),
+                max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", 20)),
+                keepalive_expiry=30,
+            )
+            # Rate limits, timeouts and server errors are retried with backoff
+            self.client = AsyncOpenAI(
+                timeout=timeout,
+                max_retries=int(os.getenv("OPENAI_MAX_RETRIES", 3)),
+                http_client=DefaultAsyncHttpxClient(timeout=timeout, limits=limits),
+            )
+            self._initialized = True
@@ -127,96 +127,46 @@ class ReadingFunctions:
         except Exception as e:
             raise ValueError(f"Error processing HTML content: {str(e)}")
 
-    def _process_pdf(self, file_bytes: bytes):
-        pdf_data = {"sentences": [], "page_number": [], "is_header": [], "is_table": []}
-        pdf_file = io.BytesIO(file_bytes)
-        with fitz.open(stream=pdf_file, filetype="pdf") as pdf:
-            # Process each page
-            markdown_pages = pymupdf4llm.to_markdown(
+    def _convert_pdf(self, file_bytes: bytes) -> list:
+        """Markdown chunk of each page of a PDF"""
+        with fitz.open(stream=io.BytesIO(file_bytes), filetype="pdf") as pdf:
+            return pymupdf4llm.to_markdown(
                 pdf, page_chunks=True, show_progress=False, margins=0
             )
-            for i, page in enumerate(markdown_pages):
-                splits = self.markdown_splitter.split_text(page["text"])
-                for split in splits:
-                    if not len(split.page_content) > 5 or re.match(
-                        r"^[^\w]*$", split.page_content
-                    ):
-                        continue
-                    elif (
-                        split.metadata and split.page_content[0] == "#"
-                    ):  # Header detection
-                        pdf_data["sentences"].append(split.page_content)
-                        pdf_data["is_header"].append(True)
-                        pdf_data["is_table"].append(False)
-                        pdf_data["page_number"].append(i + 1)
-                    elif (
-                        split.page_content[0] == "*"
-                        and split.page_content[-1] == "*"
-                        and (
-                            re.match(
-                                r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
-                                split.page_content,
-                            )
-                            or re.match(
-                                r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
-                                split.page_content,
-                            )
-                        )
-                    ):  # Sub-Header and Header variant detection
-                        pdf_data["sentences"].append(split.page_content)
-                        pdf_data["is_header"].append(True)
-                        pdf_data["is_table"].append(False)
-                        pdf_data["page_number"].append(i + 1)
-                    elif (
-                        split.page_content[0] == "|" and split.page_content[-1] == "|"
-                    ):  # Table detection
-                        pdf_data["sentences"].append(split.page_content)
-                        pdf_data["is_header"].append(False)
-                        pdf_data["is_table"].append(True)
-                        pdf_data["page_number"].append(i + 1)
-                    else:
-                        pdf_data["sentences"].append(split.page_content)
-                        pdf_data["is_header"].append(False)
-                        pdf_data["is_table"].append(False)
-                        pdf_data["page_number"].append(i + 1)
-        return pdf_data
 
-    def _process_docx(self, file_bytes: bytes):
-        docx_data = {
-            "sentences": [],
-            "page_number": [],
-            "is_header": [],
-            "is_table": [],
-        }
-        current_length = 0
-        chars_per_page = 2000
-        current_page = 1
+    def _convert_with_docling(self, file_bytes: bytes, suffix: str) -> str:
+        """Markdown of a document docling reads by its file extension"""
+        with tempfile.NamedTemporaryFile(delete=True, suffix=suffix) as temp_file:
+            temp_file.write(file_bytes)
+            temp_file.flush()
+            return self.converter.convert(
+                Path(temp_file.name)
+            ).document.export_to_markdown()
 
-        docx_file = io.BytesIO(file_bytes)
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".docx") as temp_file:
-            temp_file.write(docx_file.getvalue())
-            docx_path = Path(temp_file.name)
-            md_text = self.converter.convert(docx_path).document.export_to_markdown()
-            splits = self.markdown_splitter.split_text(md_text)
-            for split in splits:
-                if current_length + len(split.page_content) > chars_per_page:
-                    current_page += 1
-                    current_length = 0
+    def _convert_udf(self, file_bytes: bytes) -> str:
+        """Markdown text stored in the content.xml of a UDF archive"""
+        with zipfile.ZipFile(io.BytesIO(file_bytes), "r") as zip_ref:
+            xml_content = zip_ref.read("content.xml")
+        dataTree = ET.parse(io.BytesIO(xml_content))
+        return dataTree.find(".//content").text.strip()
 
-                if (
-                    not len(split.page_content) > 5
-                    or re.match(r"^[^\w]*$", split.page_content)
-                    or split.page_content[:4] == "<!--"
+    def _process_pdf(self, file_bytes: bytes):
+        pdf_data = {"sentences": [], "page_number": [], "is_header": [], "is_table": []}
+        markdown_pages = self._convert_pdf(file_bytes=file_bytes)
+        for i, page in enumerate(markdown_pages):
+            splits = self.markdown_splitter.split_text(page["text"])
+            for split in splits:
+                if not len(split.page_content) > 5 or re.match(
+                    r"^[^\w]*$", split.page_content
                 ):
                     continue
                 elif (
                     split.metadata and split.page_content[0] == "#"
                 ):  # Header detection
-                    docx_data["sentences"].append(split.page_content)
-                    docx_data["is_header"].append(True)
-                    docx_data["is_table"].append(False)
-                    docx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    pdf_data["sentences"].append(split.page_content)
+                    pdf_data["is_header"].append(True)
+                    pdf_data["is_table"].append(False)
+                    pdf_data["page_number"].append(i + 1)
                 elif (
                     split.page_content[0] == "*"
                     and split.page_content[-1] == "*"
@@ -231,25 +181,87 @@ class ReadingFunctions:
                         )
                     )
                 ):  # Sub-Header and Header variant detection
-                    docx_data["sentences"].append(split.page_content)
-                    docx_data["is_header"].append(True)
-                    docx_data["is_table"].append(False)
-                    docx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    pdf_data["sentences"].append(split.page_content)
+                    pdf_data["is_header"].append(True)
+                    pdf_data["is_table"].append(False)
+                    pdf_data["page_number"].append(i + 1)
                 elif (
                     split.page_content[0] == "|" and split.page_content[-1] == "|"
                 ):  # Table detection
-                    docx_data["sentences"].append(split.page_content)
-                    docx_data["is_header"].append(False)
-                    docx_data["is_table"].append(True)
-                    docx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    pdf_data["sentences"].append(split.page_content)
+                    pdf_data["is_header"].append(False)
+                    pdf_data["is_table"].append(True)
+                    pdf_data["page_number"].append(i + 1)
                 else:
-                    docx_data["sentences"].append(split.page_content)
-                    docx_data["is_header"].append(False)
-                    docx_data["is_table"].append(False)
-                    docx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    pdf_data["sentences"].append(split.page_content)
+                    pdf_data["is_header"].append(False)
+                    pdf_data["is_table"].append(False)
+                    pdf_data["page_number"].append(i + 1)
+        return pdf_data
+
+    def _process_docx(self, file_bytes: bytes):
+        docx_data = {
+            "sentences": [],
+            "page_number": [],
+            "is_header": [],
+            "is_table": [],
+        }
+        current_length = 0
+        chars_per_page = 2000
+        current_page = 1
+
+        md_text = self._convert_with_docling(file_bytes=file_bytes, suffix=".docx")
+        splits = self.markdown_splitter.split_text(md_text)
+        for split in splits:
+            if current_length + len(split.page_content) > chars_per_page:
+                current_page += 1
+                current_length = 0
+
+            if (
+                not len(split.page_content) > 5
+                or re.match(r"^[^\w]*$", split.page_content)
+                or split.page_content[:4] == "<!--"
+            ):
+                continue
+            elif split.metadata and split.page_content[0] == "#":  # Header detection
+                docx_data["sentences"].append(split.page_content)
+                docx_data["is_header"].append(True)
+                docx_data["is_table"].append(False)
+                docx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "*"
+                and split.page_content[-1] == "*"
+                and (
+                    re.match(
+                        r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
+                        split.page_content,
+                    )
+                    or re.match(
+                        r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
+                        split.page_content,
+                    )
+                )
+            ):  # Sub-Header and Header variant detection
+                docx_data["sentences"].append(split.page_content)
+                docx_data["is_header"].append(True)
+                docx_data["is_table"].append(False)
+                docx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "|" and split.page_content[-1] == "|"
+            ):  # Table detection
+                docx_data["sentences"].append(split.page_content)
+                docx_data["is_header"].append(False)
+                docx_data["is_table"].append(True)
+                docx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            else:
+                docx_data["sentences"].append(split.page_content)
+                docx_data["is_header"].append(False)
+                docx_data["is_table"].append(False)
+                docx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
         return docx_data
 
     def _process_pptx(self, file_bytes: bytes):
@@ -262,63 +274,57 @@ class ReadingFunctions:
         current_length = 0
         chars_per_page = 500
         current_page = 1
-        pptx_file = io.BytesIO(file_bytes)
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".pptx") as temp_file:
-            temp_file.write(pptx_file.getvalue())
-            pptx_path = Path(temp_file.name)
-            md_text = self.converter.convert(pptx_path).document.export_to_markdown()
-            splits = self.markdown_splitter.split_text(md_text)
-            for split in splits:
-                if current_length + len(split.page_content) > chars_per_page:
-                    current_page += 1
-                    current_length = 0
-                if (
-                    not len(split.page_content) > 5
-                    or re.match(r"^[^\w]*$", split.page_content)
-                    or split.page_content[:4] == "<!--"
-                ):
-                    continue
-                elif (
-                    split.metadata and split.page_content[0] == "#"
-                ):  # Header detection
-                    pptx_data["sentences"].append(split.page_content)
-                    pptx_data["is_header"].append(True)
-                    pptx_data["is_table"].append(False)
-                    pptx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "*"
-                    and split.page_content[-1] == "*"
-                    and (
-                        re.match(
-                            r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
-                            split.page_content,
-                        )
-                        or re.match(
-                            r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
-                            split.page_content,
-                        )
+        md_text = self._convert_with_docling(file_bytes=file_bytes, suffix=".pptx")
+        splits = self.markdown_splitter.split_text(md_text)
+        for split in splits:
+            if current_length + len(split.page_content) > chars_per_page:
+                current_page += 1
+                current_length = 0
+            if (
+                not len(split.page_content) > 5
+                or re.match(r"^[^\w]*$", split.page_content)
+                or split.page_content[:4] == "<!--"
+            ):
+                continue
+            elif split.metadata and split.page_content[0] == "#":  # Header detection
+                pptx_data["sentences"].append(split.page_content)
+                pptx_data["is_header"].append(True)
+                pptx_data["is_table"].append(False)
+                pptx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "*"
+                and split.page_content[-1] == "*"
+                and (
+                    re.match(
+                        r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
+                        split.page_content,
                     )
-                ):  # Sub-Header and Header variant detection
-                    pptx_data["sentences"].append(split.page_content)
-                    pptx_data["is_header"].append(True)
-                    pptx_data["is_table"].append(False)
-                    pptx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "|" and split.page_content[-1] == "|"
-                ):  # Table detection
-                    pptx_data["sentences"].append(split.page_content)
-                    pptx_data["is_header"].append(False)
-                    pptx_data["is_table"].append(True)
-                    pptx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                else:
-                    pptx_data["sentences"].append(split.page_content)
-                    pptx_data["is_header"].append(False)
-                    pptx_data["is_table"].append(False)
-                    pptx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    or re.match(
+                        r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
+                        split.page_content,
+                    )
+                )
+            ):  # Sub-Header and Header variant detection
+                pptx_data["sentences"].append(split.page_content)
+                pptx_data["is_header"].append(True)
+                pptx_data["is_table"].append(False)
+                pptx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "|" and split.page_content[-1] == "|"
+            ):  # Table detection
+                pptx_data["sentences"].append(split.page_content)
+                pptx_data["is_header"].append(False)
+                pptx_data["is_table"].append(True)
+                pptx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            else:
+                pptx_data["sentences"].append(split.page_content)
+                pptx_data["is_header"].append(False)
+                pptx_data["is_table"].append(False)
+                pptx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
         return pptx_data
 
     def _process_xlsx(self, file_bytes: bytes):
@@ -331,63 +337,57 @@ class ReadingFunctions:
         current_length = 0
         chars_per_page = 2000
         current_page = 1
-        xlsx_file = io.BytesIO(file_bytes)
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".xlsx") as temp_file:
-            temp_file.write(xlsx_file.getvalue())
-            xlsx_path = Path(temp_file.name)
-            md_text = self.converter.convert(xlsx_path).document.export_to_markdown()
-            splits = self.markdown_splitter.split_text(md_text)
-            for split in splits:
-                if current_length + len(split.page_content) > chars_per_page:
-                    current_page += 1
-                    current_length = 0
-                if (
-                    not len(split.page_content) > 5
-                    or re.match(r"^[^\w]*$", split.page_content)
-                    or split.page_content[:4] == "<!--"
-                ):
-                    continue
-                elif (
-                    split.metadata and split.page_content[0] == "#"
-                ):  # Header detection
-                    xlsx_data["sentences"].append(split.page_content)
-                    xlsx_data["is_header"].append(True)
-                    xlsx_data["is_table"].append(False)
-                    xlsx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "*"
-                    and split.page_content[-1] == "*"
-                    and (
-                        re.match(
-                            r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
-                            split.page_content,
-                        )
-                        or re.match(
-                            r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
-                            split.page_content,
-                        )
+        md_text = self._convert_with_docling(file_bytes=file_bytes, suffix=".xlsx")
+        splits = self.markdown_splitter.split_text(md_text)
+        for split in splits:
+            if current_length + len(split.page_content) > chars_per_page:
+                current_page += 1
+                current_length = 0
+            if (
+                not len(split.page_content) > 5
+                or re.match(r"^[^\w]*$", split.page_content)
+                or split.page_content[:4] == "<!--"
+            ):
+                continue
+            elif split.metadata and split.page_content[0] == "#":  # Header detection
+                xlsx_data["sentences"].append(split.page_content)
+                xlsx_data["is_header"].append(True)
+                xlsx_data["is_table"].append(False)
+                xlsx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "*"
+                and split.page_content[-1] == "*"
+                and (
+                    re.match(
+                        r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
+                        split.page_content,
                     )
-                ):  # Sub-Header and Header variant detection
-                    xlsx_data["sentences"].append(split.page_content)
-                    xlsx_data["is_header"].append(True)
-                    xlsx_data["is_table"].append(False)
-                    xlsx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "|" and split.page_content[-1] == "|"
-                ):  # Table detection
-                    xlsx_data["sentences"].append(split.page_content)
-                    xlsx_data["is_header"].append(False)
-                    xlsx_data["is_table"].append(True)
-                    xlsx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                else:
-                    xlsx_data["sentences"].append(split.page_content)
-                    xlsx_data["is_header"].append(False)
-                    xlsx_data["is_table"].append(False)
-                    xlsx_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    or re.match(
+                        r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
+                        split.page_content,
+                    )
+                )
+            ):  # Sub-Header and Header variant detection
+                xlsx_data["sentences"].append(split.page_content)
+                xlsx_data["is_header"].append(True)
+                xlsx_data["is_table"].append(False)
+                xlsx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "|" and split.page_content[-1] == "|"
+            ):  # Table detection
+                xlsx_data["sentences"].append(split.page_content)
+                xlsx_data["is_header"].append(False)
+                xlsx_data["is_table"].append(True)
+                xlsx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            else:
+                xlsx_data["sentences"].append(split.page_content)
+                xlsx_data["is_header"].append(False)
+                xlsx_data["is_table"].append(False)
+                xlsx_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
         return xlsx_data
 
     def _process_udf(self, file_bytes: bytes):
@@ -401,65 +401,58 @@ class ReadingFunctions:
         chars_per_page = 2000
         current_page = 1
 
-        udf_file = io.BytesIO(file_bytes)
-        with zipfile.ZipFile(udf_file, "r") as zip_ref:
-            xml_content = zip_ref.read("content.xml")
-            dataTree = ET.parse(io.BytesIO(xml_content))
-            splits = self.markdown_splitter.split_text(
-                dataTree.find(".//content").text.strip()
-            )
-            for split in splits:
-                if current_length + len(split.page_content) > chars_per_page:
-                    current_page += 1
-                    current_length = 0
+        md_text = self._convert_udf(file_bytes=file_bytes)
+        splits = self.markdown_splitter.split_text(md_text)
+        for split in splits:
+            if current_length + len(split.page_content) > chars_per_page:
+                current_page += 1
+                current_length = 0
 
-                if (
-                    not len(split.page_content) > 5
-                    or re.match(r"^[^\w]*$", split.page_content)
-                    or split.page_content[:4] == "<!--"
-                ):
-                    continue
-                elif (
-                    split.metadata and split.page_content[0] == "#"
-                ):  # Header detection
-                    udf_data["sentences"].append(split.page_content)
-                    udf_data["is_header"].append(True)
-                    udf_data["is_table"].append(False)
-                    udf_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "*"
-                    and split.page_content[-1] == "*"
-                    and (
-                        re.match(
-                            r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
-                            split.page_content,
-                        )
-                        or re.match(
-                            r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
-                            split.page_content,
-                        )
+            if (
+                not len(split.page_content) > 5
+                or re.match(r"^[^\w]*$", split.page_content)
+                or split.page_content[:4] == "<!--"
+            ):
+                continue
+            elif split.metadata and split.page_content[0] == "#":  # Header detection
+                udf_data["sentences"].append(split.page_content)
+                udf_data["is_header"].append(True)
+                udf_data["is_table"].append(False)
+                udf_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "*"
+                and split.page_content[-1] == "*"
+                and (
+                    re.match(
+                        r"(\*{2,})(\d+(?:\.\d+)*)\s*(\*{2,})?(.*)$",
+                        split.page_content,
                     )
-                ):  # Sub-Header and Header variant detection
-                    udf_data["sentences"].append(split.page_content)
-                    udf_data["is_header"].append(True)
-                    udf_data["is_table"].append(False)
-                    udf_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                elif (
-                    split.page_content[0] == "|" and split.page_content[-1] == "|"
-                ):  # Table detection
-                    udf_data["sentences"].append(split.page_content)
-                    udf_data["is_header"].append(False)
-                    udf_data["is_table"].append(True)
-                    udf_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
-                else:
-                    udf_data["sentences"].append(split.page_content)
-                    udf_data["is_header"].append(False)
-                    udf_data["is_table"].append(False)
-                    udf_data["page_number"].append(current_page)
-                    current_length += len(split.page_content)
+                    or re.match(
+                        r"(\*{1,3})?([A-Z][a-zA-Z\s\-]+)(\*{1,3})?$",
+                        split.page_content,
+                    )
+                )
+            ):  # Sub-Header and Header variant detection
+                udf_data["sentences"].append(split.page_content)
+                udf_data["is_header"].append(True)
+                udf_data["is_table"].append(False)
+                udf_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            elif (
+                split.page_content[0] == "|" and split.page_content[-1] == "|"
+            ):  # Table detection
+                udf_data["sentences"].append(split.page_content)
+                udf_data["is_header"].append(False)
+                udf_data["is_table"].append(True)
+                udf_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
+            else:
+                udf_data["sentences"].append(split.page_content)
+                udf_data["is_header"].append(False)
+                udf_data["is_table"].append(False)
+                udf_data["page_number"].append(current_page)
+                current_length += len(split.page_content)
         return udf_data
 
     def _process_txt(self, file_bytes: bytes):
@@ -0,0 +1,173 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import threading
+
+from ..parse_cache import ParseCache
+from .. import profiling
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when ReadingFunctions output changes, older cached parse results are ignored
+PARSER_VERSION = "1"
+
+# Reader of the current worker process, loaded once by the pool initializer
+_reader = None
+
+
+def _init_worker(memory_limit_mb: int):
+    global _reader
+    if memory_limit_mb:
+        memory_limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (memory_limit, memory_limit))
+
+    from .reading_functions import ReadingFunctions
+
+    _reader = ReadingFunctions()
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("Parsing took too long")
+
+
+def _call_reader(reader, method: str, kwargs: dict, profile_id: str = None):
+    if profile_id:
+        return profiling.profile_call(
+            f"{profile_id}-reading",
+            f"ReadingFunctions.{method}",
+            getattr(reader, method),
+            **kwargs,
+        )
+    return getattr(reader, method)(**kwargs)
+
+
+def _run_job(method: str, timeout: int, kwargs: dict, profile_id: str = None):
+    """Run a reader method inside a worker, interrupted after timeout seconds"""
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.alarm(timeout)
+    try:
+        return _call_reader(_reader, method, kwargs, profile_id)
+    finally:
+        signal.alarm(0)
+
+
+class ReadingPool:
+    """Parses documents in worker processes preloaded with ReadingFunctions"""
+
+    def __init__(self, encryptor=None):
+        self.workers = int(os.getenv("READING_POOL_WORKERS", os.cpu_count() or 1))
+        self.job_timeout = int(os.getenv("READING_JOB_TIMEOUT", 300))
+        self.memory_limit_mb = int(os.getenv("READING_WORKER_MEMORY_MB", 4096))
+        # Limit of ReadingFunctions, checked before uploads are queued
+        self.max_file_size_mb = 50
+        self._executor = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self.parse_cache = ParseCache(
+            parser_version=PARSER_VERSION, encryptor=encryptor
+        )
+
+    async def read_file(self, file_bytes: bytes, file_name: str, profile_id=None):
+        file_type = file_name.split(".")[-1].lower()
+        return await self._read_cached(
+            file_bytes,
+            file_type,
+            "read_file",
+            {"file_bytes": file_bytes, "file_name": file_name},
+            profile_id,
+        )
+
+    async def read_url(self, html_content: str, profile_id=None):
+        return await self._read_cached(
+            html_content.encode("utf-8"),
+            "html",
+            "read_url",
+            {"html_content": html_content},
+            profile_id,
+        )
+
+    async def _read_cached(
+        self,
+        content: bytes,
+        file_type: str,
+        method: str,
+        kwargs: dict,
+        profile_id: str = None,
+    ):
+        """Parse result of identical content is reused, only misses are parsed"""
+        key = await asyncio.to_thread(self.parse_cache.make_key, content, file_type)
+        file_data = await asyncio.to_thread(self.parse_cache.get, key)
+        if file_data is not None:
+            return file_data
+
+        file_data = await self._submit(method, kwargs, profile_id)
+        await asyncio.to_thread(self.parse_cache.put, key, file_data)
+        return file_data
+
+    async def _submit(self, method: str, kwargs: dict, profile_id: str = None):
+        # Without workers parsing runs in a thread of this process
+        if not self.workers:
+            return await asyncio.to_thread(
+                self._read_inline, method, kwargs, profile_id
+            )
+
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(
+            executor, _run_job, method, self.job_timeout, kwargs, profile_id
+        )
+
+        # Workers stop jobs themselves, waiting longer covers a stuck worker
+        done, _ = await asyncio.wait({job}, timeout=self.job_timeout + 30)
+        if not done:
+            logger.error("Reading worker is not responding, restarting reading pool")
+            self._reset_executor(executor)
+            raise TimeoutError("Parsing took too long")
+
+        try:
+            return job.result()
+        except BrokenProcessPool:
+            logger.error("Reading worker died, restarting reading pool")
+            self._reset_executor(executor)
+            raise ValueError("Document could not be processed within memory limits")
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb,),
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        for process in list(executor._processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _read_inline(self, method: str, kwargs: dict, profile_id: str = None):
+        with self._lock:
+            if self._reader is None:
+                from .reading_functions import ReadingFunctions
+
+                self._reader = ReadingFunctions()
+        with self._read_lock:
+            return _call_reader(self._reader, method, kwargs, profile_id)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
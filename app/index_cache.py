@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+
+from .metrics import INDEX_CACHE_BYTES, INDEX_CACHE_ENTRIES, INDEX_CACHE_DOMAIN_BYTES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IndexCache:
+    """In-process LRU cache of FAISS search data, bounded by a memory budget"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(IndexCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.max_bytes = int(os.getenv("INDEX_CACHE_MAX_MB", 512)) * 1024 * 1024
+            self._entries = OrderedDict()
+            self._sizes = {}
+            self._total_bytes = 0
+            self._lock = threading.Lock()
+            # Builds running on the event loop, by key
+            self._building = {}
+            self._initialized = True
+
+    @staticmethod
+    def content_version(file_ids: list, sentence_amount: int) -> str:
+        """Version of domain content, changes whenever files are added or removed"""
+        payload = ",".join(sorted(str(file_id) for file_id in file_ids))
+        payload += f":{sentence_amount}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(domain_id: str, version: str) -> tuple:
+        return (domain_id, version)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Return cached entry and mark it as most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: Any, size_bytes: int) -> bool:
+        """Store entry, evicting least recently used entries over the budget"""
+        if size_bytes > self.max_bytes:
+            logger.warning(
+                f"Index cache entry of {size_bytes} bytes exceeds budget, not cached"
+            )
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._sizes[key] = size_bytes
+            self._total_bytes += size_bytes
+
+            while self._total_bytes > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                logger.info(f"Evicted index cache entry for domain {evicted_key[0]}")
+            self._update_metrics()
+        INDEX_CACHE_DOMAIN_BYTES.observe(size_bytes)
+        return True
+
+    async def get_or_build(
+        self,
+        key: tuple,
+        build: Callable[[], Awaitable[Any]],
+        size_of: Callable[[Any], int],
+    ) -> Any:
+        """Cached entry of key, built once however many callers miss it together
+
+        The first caller builds, later callers await the same build. Older
+        versions of the domain are dropped once the new entry is stored, so
+        questions keep their cached entry while the build runs.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        future = self._building.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            entry = await build()
+            self.put(key, entry, size_of(entry))
+            self.invalidate_domain(key[0], keep=key)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters get the error, without waiters it must not be reported
+            future.exception()
+            raise
+        finally:
+            del self._building[key]
+
+    def invalidate_domain(self, domain_id: str, keep: tuple = None) -> int:
+        """Drop every cached entry of a domain, except the keep key if given"""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == domain_id and key != keep]
+            for key in keys:
+                self._remove(key)
+            self._update_metrics()
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self._update_metrics()
+
+    def get_memory_usage(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _update_metrics(self) -> None:
+        INDEX_CACHE_BYTES.set(self._total_bytes)
+        INDEX_CACHE_ENTRIES.set(len(self._entries))
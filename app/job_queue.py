@@ -0,0 +1,323 @@
+from collections import deque
+from typing import Optional, Callable, Awaitable
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IngestionError(Exception):
+    """Permanent ingestion failure, the job is not retried"""
+
+    pass
+
+
+class RedisJobStore:
+    """Jobs, payloads and queue lists kept in Redis, survive worker restarts"""
+
+    def __init__(self, redis_manager, expiry: int = 86400):
+        self.redis_manager = redis_manager
+        self.expiry = expiry
+
+    def set_job(self, job: dict) -> bool:
+        return self.redis_manager.set_data(
+            f"ingestion:job:{job['job_id']}", job, expiry=self.expiry
+        )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        return self.redis_manager.get_data(f"ingestion:job:{job_id}")
+
+    def set_payload(self, job_id: str, payload: Optional[bytes]) -> bool:
+        return self.redis_manager.set_data(
+            f"ingestion:payload:{job_id}", payload, expiry=self.expiry
+        )
+
+    def get_payload(self, job_id: str) -> Optional[bytes]:
+        return self.redis_manager.get_data(f"ingestion:payload:{job_id}")
+
+    def delete_payload(self, job_id: str) -> bool:
+        return self.redis_manager.delete_data(f"ingestion:payload:{job_id}")
+
+    def push(self, job_id: str) -> bool:
+        return self.redis_manager.push_list("ingestion:queue", job_id)
+
+    def pop(self) -> Optional[str]:
+        return self.redis_manager.move_list_item(
+            "ingestion:queue", "ingestion:processing"
+        )
+
+    def ack(self, job_id: str) -> bool:
+        return self.redis_manager.remove_list_item("ingestion:processing", job_id)
+
+    def processing(self) -> list:
+        return self.redis_manager.get_list("ingestion:processing")
+
+    def schedule(self, job_id: str, at: float) -> bool:
+        return self.redis_manager.schedule_item("ingestion:scheduled", job_id, at)
+
+    def due(self, now: float) -> list:
+        return self.redis_manager.pop_due_items("ingestion:scheduled", now)
+
+
+class LocalJobStore:
+    """In-process stand-in of RedisJobStore for tests and single-process runs"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._payloads = {}
+        self._queue = deque()
+        self._processing = []
+        self._scheduled = {}
+        self._lock = threading.Lock()
+
+    def set_job(self, job: dict) -> bool:
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+        return True
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def set_payload(self, job_id: str, payload: Optional[bytes]) -> bool:
+        with self._lock:
+            self._payloads[job_id] = payload
+        return True
+
+    def get_payload(self, job_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._payloads.get(job_id)
+
+    def delete_payload(self, job_id: str) -> bool:
+        with self._lock:
+            return self._payloads.pop(job_id, None) is not None
+
+    def push(self, job_id: str) -> bool:
+        with self._lock:
+            self._queue.append(job_id)
+        return True
+
+    def pop(self) -> Optional[str]:
+        with self._lock:
+            if not self._queue:
+                return None
+            job_id = self._queue.popleft()
+            self._processing.append(job_id)
+            return job_id
+
+    def ack(self, job_id: str) -> bool:
+        with self._lock:
+            if job_id in self._processing:
+                self._processing.remove(job_id)
+                return True
+            return False
+
+    def processing(self) -> list:
+        with self._lock:
+            return list(self._processing)
+
+    def schedule(self, job_id: str, at: float) -> bool:
+        with self._lock:
+            self._scheduled[job_id] = at
+        return True
+
+    def due(self, now: float) -> list:
+        with self._lock:
+            job_ids = [job_id for job_id, at in self._scheduled.items() if at <= now]
+            for job_id in job_ids:
+                del self._scheduled[job_id]
+            return job_ids
+
+
+class IngestionQueue:
+    """Queue of file ingestion jobs with retries and per-job progress"""
+
+    stages = {
+        "queued": 0.0,
+        "fetching": 0.1,
+        "parsing": 0.2,
+        "embedding": 0.6,
+        "staging": 0.9,
+        "done": 1.0,
+    }
+
+    def __init__(self, store):
+        self.store = store
+        self.max_attempts = int(os.getenv("INGESTION_MAX_ATTEMPTS", 3))
+        self.retry_delay = float(os.getenv("INGESTION_RETRY_DELAY", 2))
+        self.poll_interval = float(os.getenv("INGESTION_POLL_INTERVAL", 0.5))
+        # Running jobs without a heartbeat for this long belong to a dead worker
+        self.stale_after = float(os.getenv("INGESTION_STALE_SECONDS", 900))
+        self.heartbeat_interval = self.stale_after / 3
+
+    def enqueue(
+        self,
+        user_id: str,
+        kind: str,
+        file_name: str,
+        params: dict,
+        payload=None,
+        profile_id: str = None,
+    ) -> str:
+        job_id = str(uuid.uuid4())
+        self.store.set_payload(job_id, payload)
+        self.store.set_job(
+            {
+                "job_id": job_id,
+                "user_id": user_id,
+                "kind": kind,
+                "file_name": file_name,
+                "params": params,
+                "status": "queued",
+                "stage": "queued",
+                "progress": 0.0,
+                "attempts": 0,
+                "error": None,
+                "profile_id": profile_id,
+                "updated_at": time.time(),
+            }
+        )
+        self.store.push(job_id)
+        return job_id
+
+    def get_status(self, job_id: str, user_id: str) -> Optional[dict]:
+        job = self.store.get_job(job_id)
+        if not job or job["user_id"] != user_id:
+            return None
+        return {
+            key: job[key]
+            for key in [
+                "job_id",
+                "file_name",
+                "status",
+                "stage",
+                "progress",
+                "attempts",
+                "error",
+            ]
+        }
+
+    def update_stage(self, job_id: str, stage: str) -> None:
+        job = self.store.get_job(job_id)
+        if job:
+            job.update(stage=stage, progress=self.stages[stage], updated_at=time.time())
+            self.store.set_job(job)
+
+    def recover_stale_jobs(self) -> int:
+        """Put jobs of workers that died while running them back in the queue"""
+        recovered = 0
+        for job_id in self.store.processing():
+            job = self.store.get_job(job_id)
+            if job and time.time() - job["updated_at"] < self.stale_after:
+                continue
+            if self.store.ack(job_id) and job:
+                job.update(status="queued", stage="queued", updated_at=time.time())
+                self.store.set_job(job)
+                self.store.push(job_id)
+                recovered += 1
+        if recovered:
+            logger.warning(f"Recovered {recovered} stale ingestion jobs")
+        return recovered
+
+    def release_due_retries(self) -> int:
+        """Queue retries whose backoff has passed"""
+        job_ids = self.store.due(time.time())
+        for job_id in job_ids:
+            self.store.push(job_id)
+        return len(job_ids)
+
+    async def keep_alive(self, job_id: str) -> None:
+        """Renew updated_at of a running job so it is not taken for stale"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            job = self.store.get_job(job_id)
+            if job:
+                job.update(updated_at=time.time())
+                self.store.set_job(job)
+
+    async def run_with_heartbeat(self, job: dict, handler) -> None:
+        heartbeat = asyncio.create_task(self.keep_alive(job["job_id"]))
+        try:
+            await handler(job, self.store.get_payload(job["job_id"]))
+        finally:
+            heartbeat.cancel()
+
+    async def run_worker(
+        self,
+        handler: Callable[[dict, Optional[bytes]], Awaitable[None]],
+        stop_event: asyncio.Event,
+    ) -> None:
+        """Process jobs until stop_event is set, handler raises to fail a job"""
+        last_recovery = 0.0
+        while not stop_event.is_set():
+            if time.time() - last_recovery > self.stale_after / 10:
+                self.recover_stale_jobs()
+                last_recovery = time.time()
+            self.release_due_retries()
+
+            job_id = self.store.pop()
+            if not job_id:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process_job(job_id, handler)
+
+    async def process_job(self, job_id: str, handler) -> None:
+        job = self.store.get_job(job_id)
+        if not job:
+            self.store.ack(job_id)
+            return
+
+        job.update(
+            status="running", attempts=job["attempts"] + 1, updated_at=time.time()
+        )
+        self.store.set_job(job)
+
+        try:
+            await self.run_with_heartbeat(job, handler)
+        except Exception as e:
+            retry = not isinstance(e, IngestionError)
+            retry = retry and job["attempts"] < self.max_attempts
+            logger.error(
+                f"Ingestion job {job_id} failed on attempt {job['attempts']}: {str(e)}"
+            )
+            job = self.store.get_job(job_id) or job
+            job.update(error=str(e), updated_at=time.time())
+
+            if retry:
+                # Backoff runs in the schedule, the worker takes the next job
+                job.update(status="queued", stage="queued", progress=0.0)
+                self.store.set_job(job)
+                self.store.ack(job_id)
+                self.store.schedule(
+                    job_id,
+                    time.time() + self.retry_delay * 2 ** (job["attempts"] - 1),
+                )
+            else:
+                # Parameters may hold access tokens, finished jobs drop them
+                job.update(status="failed", params={})
+                self.store.set_job(job)
+                self.store.ack(job_id)
+                self.store.delete_payload(job_id)
+            return
+
+        job = self.store.get_job(job_id) or job
+        job.update(
+            status="done",
+            stage="done",
+            progress=1.0,
+            params={},
+            error=None,
+            updated_at=time.time(),
+        )
+        self.store.set_job(job)
+        self.store.ack(job_id)
+        self.store.delete_payload(job_id)
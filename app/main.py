@@ -1,18 +1,32 @@
-from fastapi import FastAPI, Request, Cookie
+from fastapi import FastAPI, Request, Cookie, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
+from contextlib import asynccontextmanager
 import os
 
 from .api import endpoints
 from .db.database import Database
+from .metrics import render_metrics
+from . import profiling
 
-app = FastAPI(title="ragchat")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    endpoints.start_ingestion_workers()
+    yield
+    await endpoints.stop_ingestion_workers()
+
+
+app = FastAPI(title="ragchat", lifespan=lifespan)
 app.add_middleware(
     SessionMiddleware,
     secret_key=os.getenv("MIDDLEWARE_SECRET_KEY"),
 )
+# Not installed at all unless PROFILING_TOKEN is set
+if profiling.enabled():
+    app.add_middleware(profiling.ProfilingMiddleware)
 app.router.timeout = 300
 app.include_router(endpoints.router, prefix="/api/v1", tags=["files"])
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -62,3 +76,19 @@ async def app_page(
 @app.get("/api/version")
 async def get_version():
     return {"version": "2.0.3"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    data, content_type = render_metrics()
+    return Response(content=data, media_type=content_type)
+
+
+@app.get("/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, x_profile_token: str = Header(None)):
+    if not profiling.authorized(x_profile_token):
+        raise HTTPException(status_code=404)
+    path = profiling.profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404)
+    return FileResponse(path, filename=f"{profile_id}.prof")
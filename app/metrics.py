@@ -0,0 +1,88 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+import os
+import time
+
+# Stages of a question run from under a millisecond to tens of seconds
+STAGE_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    20,
+    30,
+)
+
+QA_STAGE_SECONDS = Histogram(
+    "ragchat_qa_stage_seconds",
+    "Duration of question answering stages",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+QA_REQUESTS = Counter(
+    "ragchat_qa_requests_total",
+    "Questions by endpoint and outcome",
+    ["endpoint", "outcome"],
+)
+OPENAI_IN_FLIGHT = Gauge(
+    "ragchat_openai_in_flight_requests",
+    "OpenAI requests waiting for a response",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+INDEX_CACHE_BYTES = Gauge(
+    "ragchat_index_cache_bytes",
+    "Memory used by cached domain search data",
+    multiprocess_mode="livesum",
+)
+INDEX_CACHE_ENTRIES = Gauge(
+    "ragchat_index_cache_entries",
+    "Domains with cached search data",
+    multiprocess_mode="livesum",
+)
+INDEX_CACHE_DOMAIN_BYTES = Histogram(
+    "ragchat_index_cache_domain_bytes",
+    "Size of domain search data put in the index cache",
+    buckets=tuple(2**power for power in range(16, 34, 2)),
+)
+
+
+def stage_timer(stage: str):
+    """Context manager timing one stage of a question"""
+    return QA_STAGE_SECONDS.labels(stage=stage).time()
+
+
+async def timed_stream(stage: str, tokens):
+    """Pass tokens through, timing the stream from first request to last token"""
+    start = time.perf_counter()
+    try:
+        async for token in tokens:
+            yield token
+    finally:
+        QA_STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> tuple:
+    """Exposition of all metrics, merged over workers in multiprocess mode"""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
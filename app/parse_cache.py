@@ -0,0 +1,167 @@
+from importlib import metadata
+from pathlib import Path
+from typing import Optional
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """Encrypted parse results on disk, keyed by content hash and parser version"""
+
+    # Upgrading any of these can change how the same bytes are parsed
+    parser_packages = [
+        "docling",
+        "pymupdf",
+        "pymupdf4llm",
+        "langchain-text-splitters",
+        "spacy",
+        "en-core-web-sm",
+    ]
+
+    def __init__(self, parser_version: str, directory: str = None, encryptor=None):
+        # Parse results hold document text, they are only stored encrypted
+        self.enabled = (
+            os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+            and encryptor is not None
+        )
+        self.directory = Path(directory or os.getenv("PARSE_CACHE_DIR", "parse_cache"))
+        self.max_size_mb = int(os.getenv("PARSE_CACHE_MAX_MB", 2048))
+        self.ttl = int(os.getenv("PARSE_CACHE_TTL_DAYS", 7)) * 86400
+        # Expired entries are swept at least this often, over budget at once
+        self.sweep_interval = 3600
+        self.encryptor = encryptor
+        self.version = self._full_version(parser_version)
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def make_key(self, content: bytes, file_type: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        return hashlib.sha256(
+            f"{self.version}:{file_type}:{digest}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                file_data = None
+            else:
+                encrypted = path.read_bytes()
+                file_data = json.loads(
+                    gzip.decompress(self.encryptor.decrypt_bytes(encrypted, key))
+                )
+                # Access time orders eviction, modification time is the age
+                os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            file_data = None
+        except Exception as e:
+            logger.warning(f"Parse cache entry {key} unreadable: {str(e)}")
+            file_data = None
+
+        with self._lock:
+            if file_data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return file_data
+
+    def put(self, key: str, file_data: dict) -> None:
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            # Entry key is the associated data, entries cannot be swapped
+            encrypted = self.encryptor.encrypt_bytes(
+                gzip.compress(json.dumps(file_data).encode("utf-8")), key
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                replaced_size = path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            temp_path.write_bytes(encrypted)
+            # Readers see either no entry or a complete one
+            os.replace(temp_path, path)
+
+            with self._lock:
+                if self._size is not None:
+                    self._size += len(encrypted) - replaced_size
+                sweep = (
+                    self._size is None
+                    or self._size > self.max_size_mb * 1024 * 1024
+                    or time.time() - self._last_sweep > self.sweep_interval
+                )
+            if sweep:
+                self._sweep()
+        except Exception as e:
+            logger.warning(f"Parse cache unavailable: {str(e)}")
+            temp_path.unlink(missing_ok=True)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.enc"
+
+    def _sweep(self) -> None:
+        """Remove expired entries, then least recently used ones over the size
+
+        The directory is only scanned here. Puts keep a running total of the
+        size in between, other processes writing the cache are counted at the
+        next sweep.
+        """
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*/*.enc"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        max_size = self.max_size_mb * 1024 * 1024
+        if total_size > max_size:
+            # Room for new entries, so the next puts do not sweep again
+            target_size = max_size * 0.9
+            for _, size, path in sorted(entries):
+                if total_size <= target_size:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+
+        with self._lock:
+            self._size = total_size
+            self._last_sweep = now
+
+    @classmethod
+    def _full_version(cls, parser_version: str) -> str:
+        versions = [parser_version]
+        for package in cls.parser_packages:
+            try:
+                versions.append(f"{package}={metadata.version(package)}")
+            except metadata.PackageNotFoundError:
+                versions.append(f"{package}=none")
+        return ";".join(versions)
@@ -0,0 +1,165 @@
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qs
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-z-]+$")
+
+# Id of the profile of the current request, handed on to the jobs it queues
+current_profile_id = ContextVar("current_profile_id", default=None)
+
+
+def enabled() -> bool:
+    return bool(PROFILING_TOKEN)
+
+
+def authorized(token: Optional[str], expected: Optional[str] = None) -> bool:
+    """Constant time check of a supplied profiling token"""
+    expected = expected if expected is not None else PROFILING_TOKEN
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+def profile_path(profile_id: str, directory: str = PROFILE_DIR) -> Optional[str]:
+    """Path of a saved profile, None for unknown or malformed ids"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(directory, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+
+def save_profile(
+    profiler: cProfile.Profile,
+    profile_id: str,
+    description: str,
+    seconds: float,
+    directory: str = None,
+):
+    """Write stats as <id>.prof and a cumulative time summary as <id>.txt"""
+    directory = directory or PROFILE_DIR
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, profile_id)
+        profiler.dump_stats(f"{path}.prof")
+
+        summary = io.StringIO()
+        summary.write(f"{description} took {seconds:.3f}s\n\n")
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(50)
+        with open(f"{path}.txt", "w", encoding="utf-8") as file:
+            file.write(summary.getvalue())
+
+        logger.info(f"Profile {profile_id} of {description} saved to {path}.prof")
+    except OSError as e:
+        logger.error(f"Error saving profile {profile_id}: {str(e)}")
+
+
+def profile_call(profile_id: str, description: str, function, **kwargs):
+    """Run a function under cProfile and save its stats, for worker processes"""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process
+        logger.warning(f"Profiler busy, {description} is not profiled")
+        return function(**kwargs)
+    try:
+        return function(**kwargs)
+    finally:
+        profiler.disable()
+        save_profile(
+            profiler=profiler,
+            profile_id=profile_id,
+            description=description,
+            seconds=time.perf_counter() - start,
+        )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running single requests of admins under cProfile
+
+    A request is profiled when its X-Profile-Token header, or its profile query
+    parameter, matches PROFILING_TOKEN. The handler is profiled until the last
+    body chunk is sent, so streamed answers are covered too. Stats are saved
+    to PROFILE_DIR as <id>.prof with a cumulative time summary in <id>.txt,
+    and the id is returned in the X-Profile-Id response header.
+
+    cProfile records everything running on the event loop meanwhile, profile
+    an instance without other traffic for a clean picture. Work sent to
+    threads, such as asyncio.to_thread calls, is not recorded. Files queued by
+    a profiled request are parsed in reading workers later, their
+    ReadingFunctions calls are saved as <id>-reading unless the parse cache
+    already holds the file.
+    """
+
+    def __init__(self, app, token: str = None, directory: str = None):
+        self.app = app
+        self.token = token if token is not None else PROFILING_TOKEN
+        self.directory = directory or PROFILE_DIR
+        # Only one profiler can be active per process
+        self._lock = asyncio.Lock()
+
+    def requested(self, scope: dict) -> bool:
+        if scope["type"] != "http" or not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                return authorized(value.decode("latin-1"), self.token)
+        query_string = scope.get("query_string", b"")
+        if b"profile=" not in query_string:
+            return False
+        token = parse_qs(query_string.decode("latin-1")).get("profile", [None])[0]
+        return authorized(token, self.token)
+
+    async def __call__(self, scope, receive, send):
+        if not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._lock.locked():
+            logger.warning("A profile is already running, request is not profiled")
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            profiler = cProfile.Profile()
+            token = current_profile_id.set(profile_id)
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.disable()
+                current_profile_id.reset(token)
+                save_profile(
+                    profiler=profiler,
+                    profile_id=profile_id,
+                    description=f"{scope['method']} {scope['path']}",
+                    seconds=time.perf_counter() - start,
+                    directory=self.directory,
+                )
@@ -2,6 +2,7 @@ from redis import Redis
 from typing import Optional, Any
 import pickle
 import logging
+import numpy as np
 from functools import wraps
 
 logging.basicConfig(level=logging.INFO)
@@ -74,6 +75,53 @@ class RedisManager:
             logger.error(f"Failed to get data for key {key}: {str(e)}")
             return None
 
+    @_handle_connection
+    def set_array(self, key: str, array: np.ndarray, expiry: int = 1800) -> bool:
+        """Store a 2D array as raw bytes so single rows can be read back"""
+        try:
+            meta = {"dtype": array.dtype.str, "shape": array.shape}
+            pipeline = self.client.pipeline()
+            pipeline.set(key, np.ascontiguousarray(array).tobytes(), ex=expiry)
+            pipeline.set(f"{key}:meta", pickle.dumps(meta), ex=expiry)
+            return all(pipeline.execute())
+        except Exception as e:
+            logger.error(f"Failed to set array for key {key}: {str(e)}")
+            return False
+
+    @_handle_connection
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        """Retrieve a full array stored with set_array"""
+        try:
+            data, meta = self.client.mget(key, f"{key}:meta")
+            if not data or not meta:
+                return None
+            meta = pickle.loads(meta)
+            return np.frombuffer(data, dtype=meta["dtype"]).reshape(meta["shape"])
+        except Exception as e:
+            logger.error(f"Failed to get array for key {key}: {str(e)}")
+            return None
+
+    @_handle_connection
+    def get_array_rows(self, key: str, rows: list) -> Optional[np.ndarray]:
+        """Retrieve selected rows of an array stored with set_array"""
+        try:
+            meta = self.client.get(f"{key}:meta")
+            if not meta:
+                return None
+            meta = pickle.loads(meta)
+            dtype = np.dtype(meta["dtype"])
+            row_bytes = int(np.prod(meta["shape"][1:])) * dtype.itemsize
+
+            pipeline = self.client.pipeline()
+            for row in rows:
+                start = int(row) * row_bytes
+                pipeline.getrange(key, start, start + row_bytes - 1)
+            data = b"".join(pipeline.execute())
+            return np.frombuffer(data, dtype=dtype).reshape(len(rows), -1)
+        except Exception as e:
+            logger.error(f"Failed to get array rows for key {key}: {str(e)}")
+            return None
+
     @_handle_connection
     def delete_data(self, key: str) -> bool:
         """Delete data from Redis"""
@@ -83,6 +131,91 @@ class RedisManager:
             logger.error(f"Failed to delete key {key}: {str(e)}")
             return False
 
+    @_handle_connection
+    def push_list(self, key: str, value: str) -> bool:
+        """Append a value to the tail of a list"""
+        try:
+            return bool(self.client.rpush(key, value))
+        except Exception as e:
+            logger.error(f"Failed to push to list {key}: {str(e)}")
+            return False
+
+    @_handle_connection
+    def push_capped_list(
+        self, key: str, value: bytes, max_length: int, expiry: int = 1800
+    ) -> bool:
+        """Append a value, keep the newest max_length values and refresh expiry"""
+        try:
+            # MULTI/EXEC, concurrent pushes cannot drop each other's values
+            pipeline = self.client.pipeline(transaction=True)
+            pipeline.rpush(key, value)
+            pipeline.ltrim(key, -max_length, -1)
+            pipeline.expire(key, expiry)
+            return all(pipeline.execute())
+        except Exception as e:
+            logger.error(f"Failed to push to capped list {key}: {str(e)}")
+            return False
+
+    @_handle_connection
+    def get_list_bytes(self, key: str) -> list:
+        """Get all values of a list without decoding"""
+        try:
+            return self.client.lrange(key, 0, -1)
+        except Exception as e:
+            logger.error(f"Failed to get list {key}: {str(e)}")
+            return []
+
+    @_handle_connection
+    def move_list_item(self, source: str, destination: str) -> Optional[str]:
+        """Atomically move the head of a list to the tail of another"""
+        try:
+            value = self.client.lmove(source, destination, "LEFT", "RIGHT")
+            return value.decode("utf-8") if value else None
+        except Exception as e:
+            logger.error(f"Failed to move item from list {source}: {str(e)}")
+            return None
+
+    @_handle_connection
+    def remove_list_item(self, key: str, value: str) -> bool:
+        """Remove all occurrences of a value from a list"""
+        try:
+            return bool(self.client.lrem(key, 0, value))
+        except Exception as e:
+            logger.error(f"Failed to remove item from list {key}: {str(e)}")
+            return False
+
+    @_handle_connection
+    def get_list(self, key: str) -> list:
+        """Get all values of a list"""
+        try:
+            return [value.decode("utf-8") for value in self.client.lrange(key, 0, -1)]
+        except Exception as e:
+            logger.error(f"Failed to get list {key}: {str(e)}")
+            return []
+
+    @_handle_connection
+    def schedule_item(self, key: str, value: str, at: float) -> bool:
+        """Add a value to a sorted set, scored by the time it is due"""
+        try:
+            return bool(self.client.zadd(key, {value: at}))
+        except Exception as e:
+            logger.error(f"Failed to schedule item in {key}: {str(e)}")
+            return False
+
+    @_handle_connection
+    def pop_due_items(self, key: str, now: float) -> list:
+        """Remove and return values due by now, each claimed by one caller"""
+        try:
+            values = self.client.zrangebyscore(key, "-inf", now)
+            return [
+                value.decode("utf-8")
+                for value in values
+                if self.client.zrem(key, value)
+            ]
+        except Exception as e:
+            logger.error(f"Failed to pop due items from {key}: {str(e)}")
+            return []
+
     @_handle_connection
     def clear_user_data(self, user_id: str) -> bool:
         """Clear all data for a specific user"""
@@ -0,0 +1,177 @@
+"""Synthetic documents of every format ReadingFunctions reads
+
+Each page holds a section header, a few paragraphs and, on every other page,
+a small table. Generators import their writer libraries lazily, python-docx,
+python-pptx and openpyxl come with requirements-dev.txt.
+"""
+
+from typing import List
+import html
+import io
+import random
+import zipfile
+
+WORDS = (
+    "revenue margin quarterly report customer retention contract renewal "
+    "supplier invoice compliance audit policy employee onboarding training "
+    "network latency server capacity storage backup recovery incident "
+    "forecast budget expense approval department strategy market growth"
+).split()
+
+
+def make_pages(pages: int, seed: int = 0) -> List[dict]:
+    """Header, paragraphs and optional table rows of each page"""
+    rng = random.Random(seed)
+
+    def sentence():
+        words = rng.choices(WORDS, k=rng.randint(12, 24))
+        return " ".join(words).capitalize() + "."
+
+    return [
+        {
+            "header": f"Section {page + 1} {rng.choice(WORDS).capitalize()}",
+            "paragraphs": [
+                " ".join(sentence() for _ in range(rng.randint(3, 5))) for _ in range(4)
+            ],
+            "table": (
+                [["Item", "Owner", "Amount"]]
+                + [
+                    [rng.choice(WORDS), rng.choice(WORDS), str(rng.randint(1, 9999))]
+                    for _ in range(4)
+                ]
+                if page % 2 == 0
+                else None
+            ),
+        }
+        for page in range(pages)
+    ]
+
+
+def make_pdf(pages: List[dict]) -> bytes:
+    import fitz
+
+    document = fitz.open()
+    for page in pages:
+        body = f"<h2>{html.escape(page['header'])}</h2>"
+        body += "".join(f"<p>{html.escape(p)}</p>" for p in page["paragraphs"])
+        if page["table"]:
+            body += "<table border='1'>"
+            body += "".join(
+                "<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in row) + "</tr>"
+                for row in page["table"]
+            )
+            body += "</table>"
+        pdf_page = document.new_page()
+        pdf_page.insert_htmlbox(pdf_page.rect + (50, 50, -50, -50), body)
+    return document.tobytes()
+
+
+def make_docx(pages: List[dict]) -> bytes:
+    from docx import Document
+
+    document = Document()
+    for page in pages:
+        document.add_heading(page["header"], level=2)
+        for paragraph in page["paragraphs"]:
+            document.add_paragraph(paragraph)
+        if page["table"]:
+            table = document.add_table(
+                rows=len(page["table"]), cols=len(page["table"][0])
+            )
+            for i, row in enumerate(page["table"]):
+                for j, value in enumerate(row):
+                    table.cell(i, j).text = value
+        document.add_page_break()
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pptx(pages: List[dict]) -> bytes:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    for page in pages:
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = page["header"]
+        slide.placeholders[1].text_frame.text = "\n".join(page["paragraphs"])
+        if page["table"]:
+            table = slide.shapes.add_table(
+                len(page["table"]),
+                len(page["table"][0]),
+                Inches(1),
+                Inches(5),
+                Inches(8),
+                Inches(2),
+            ).table
+            for i, row in enumerate(page["table"]):
+                for j, value in enumerate(row):
+                    table.cell(i, j).text = value
+
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    return buffer.getvalue()
+
+
+def make_xlsx(pages: List[dict]) -> bytes:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for page in pages:
+        sheet = workbook.create_sheet(page["header"][:31])
+        for row in page["table"] or [["Note"]]:
+            sheet.append(row)
+        for paragraph in page["paragraphs"]:
+            sheet.append([paragraph])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def make_markdown(pages: List[dict]) -> str:
+    blocks = []
+    for page in pages:
+        blocks.append(f"## {page['header']}")
+        blocks.extend(page["paragraphs"])
+        if page["table"]:
+            rows = [f"| {' | '.join(row)} |" for row in page["table"]]
+            rows.insert(1, "|" + "---|" * len(page["table"][0]))
+            blocks.append("\n".join(rows))
+    return "\n\n".join(blocks)
+
+
+def make_udf(pages: List[dict]) -> bytes:
+    content = make_markdown(pages)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "content.xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f"<template><content><![CDATA[{content}]]></content></template>",
+        )
+    return buffer.getvalue()
+
+
+def make_txt(pages: List[dict]) -> bytes:
+    text = "\n\n".join(
+        "\n\n".join([page["header"]] + page["paragraphs"]) for page in pages
+    )
+    return text.encode("utf-8")
+
+
+generators = {
+    "pdf": make_pdf,
+    "docx": make_docx,
+    "pptx": make_pptx,
+    "xlsx": make_xlsx,
+    "udf": make_udf,
+    "txt": make_txt,
+}
+
+
+def make_document(file_type: str, pages: int, seed: int = 0) -> bytes:
+    return generators[file_type](make_pages(pages=pages, seed=seed))
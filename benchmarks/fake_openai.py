@@ -0,0 +1,173 @@
+"""OpenAI-compatible stand-in for load tests
+
+Serves /v1/embeddings and /v1/chat/completions (plain and streamed) with
+configurable latency, so the app can be loaded without API costs:
+
+    python -m benchmarks.fake_openai --port 8901 --chat-latency-ms 800
+
+Embeddings are the deterministic local ones of EMBEDDING_PROVIDER=local.
+Query generation prompts get ten rewritten queries and an intention back,
+every other chat request gets a fixed length answer.
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+import uuid
+import numpy as np
+
+from app.functions.embedding_providers import LocalEmbeddingProvider
+
+settings = {
+    "embedding_latency_ms": 150.0,
+    "embedding_latency_per_input_ms": 0.2,
+    "chat_latency_ms": 600.0,
+    "token_delay_ms": 15.0,
+    "answer_tokens": 120,
+    "jitter": 0.2,
+    "error_rate": 0.0,
+}
+
+app = FastAPI(title="fake-openai")
+provider = LocalEmbeddingProvider()
+
+
+async def simulate_latency(milliseconds: float):
+    jitter = 1 + random.uniform(-settings["jitter"], settings["jitter"])
+    await asyncio.sleep(max(0.0, milliseconds * jitter) / 1000)
+
+
+def injected_error():
+    if random.random() < settings["error_rate"]:
+        return JSONResponse(
+            content={"error": {"message": "Injected failure", "type": "server_error"}},
+            status_code=500,
+        )
+    return None
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    data = await request.json()
+    inputs = data["input"] if isinstance(data["input"], list) else [data["input"]]
+    await simulate_latency(
+        settings["embedding_latency_ms"]
+        + settings["embedding_latency_per_input_ms"] * len(inputs)
+    )
+    error = injected_error()
+    if error:
+        return error
+
+    vectors = [
+        provider.embed_sentence(text).astype(np.float32)
+        for text in (str(text) for text in inputs)
+    ]
+    # Client asks for base64 when numpy is installed
+    if data.get("encoding_format") == "base64":
+        encoded = [base64.b64encode(vector.tobytes()).decode() for vector in vectors]
+    else:
+        encoded = [vector.tolist() for vector in vectors]
+
+    return {
+        "object": "list",
+        "model": data.get("model"),
+        "data": [
+            {"object": "embedding", "index": i, "embedding": embedding}
+            for i, embedding in enumerate(encoded)
+        ],
+        "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+    }
+
+
+def chat_content(messages: list) -> str:
+    system_prompt = messages[0]["content"] if messages else ""
+    user_message = messages[-1]["content"] if messages else ""
+    if "[corrected query]" in system_prompt:
+        queries = [user_message] + [
+            f"{user_message} ({variant})"
+            for variant in ["details", "overview", "numbers", "owners", "dates"]
+        ]
+        answers = [f"Answer about {user_message} {i}" for i in range(4)]
+        return "\n".join(queries + answers + ["general_purpose"])
+    return " ".join(["answer"] * settings["answer_tokens"])
+
+
+def completion_chunk(completion_id: str, model: str, delta: dict, finish=None):
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    data = await request.json()
+    model = data.get("model", "gpt-4o-mini")
+    content = chat_content(data.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    await simulate_latency(settings["chat_latency_ms"])
+    error = injected_error()
+    if error:
+        return error
+
+    if data.get("stream"):
+
+        async def events():
+            yield f"data: {json.dumps(completion_chunk(completion_id, model, {'role': 'assistant', 'content': ''}))}\n\n"
+            for token in content.split(" "):
+                await asyncio.sleep(settings["token_delay_ms"] / 1000)
+                chunk = completion_chunk(completion_id, model, {"content": token + " "})
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield f"data: {json.dumps(completion_chunk(completion_id, model, {}, 'stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    tokens = len(content.split(" "))
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": 0,
+            "completion_tokens": tokens,
+            "total_tokens": tokens,
+        },
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    for name, default in settings.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    args = parser.parse_args()
+    settings.update({name: getattr(args, name) for name in settings})
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
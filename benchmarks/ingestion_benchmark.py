@@ -0,0 +1,157 @@
+"""Per-format parsing benchmark of ReadingFunctions
+
+Generates documents of growing size in every supported format and parses
+them with ReadingFunctions.read_file. Converter time (pymupdf4llm, docling,
+UDF extraction) is reported apart from the markdown splitting and the
+header/table classification that follow it. Run from the repository root:
+
+    python -m benchmarks.ingestion_benchmark --pages 1 10 50 200
+
+Every measurement runs in a fresh process, so peak RSS belongs to that one
+document. Models are loaded and warmed up on a one page document first, the
+RSS after warm-up is reported as the baseline.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import statistics
+import time
+
+from .documents import generators, make_document
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Steps of ReadingFunctions that turn file bytes into markdown
+CONVERTERS = ["_convert_pdf", "_convert_with_docling", "_convert_udf"]
+
+
+def rss_mb() -> float:
+    # Linux reports kilobytes, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if platform.system() == "Darwin" else 2**10), 1)
+
+
+def measure_document(file_type: str, file_bytes: bytes, repeats: int) -> dict:
+    """Parse one document in this worker process, timing its converter"""
+    from app.functions.reading_functions import ReadingFunctions
+
+    reader = ReadingFunctions()
+    converter_seconds = [0.0]
+
+    def timed(method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                converter_seconds[0] += time.perf_counter() - start
+
+        return wrapper
+
+    for name in CONVERTERS:
+        setattr(reader, name, timed(getattr(reader, name)))
+
+    # Converters build their pipelines on first use
+    reader.read_file(make_document(file_type, pages=1), f"warmup.{file_type}")
+    baseline_rss = rss_mb()
+
+    totals, converters = [], []
+    for _ in range(repeats):
+        converter_seconds[0] = 0.0
+        start = time.perf_counter()
+        file_data = reader.read_file(file_bytes, f"benchmark.{file_type}")
+        totals.append(time.perf_counter() - start)
+        converters.append(converter_seconds[0])
+
+    return {
+        "total_seconds": statistics.median(totals),
+        "converter_seconds": statistics.median(converters),
+        "sentences": len(file_data["sentences"]),
+        "headers": sum(file_data["is_header"]),
+        "tables": sum(file_data["is_table"]),
+        "reader_pages": max(file_data["page_number"], default=0),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": rss_mb(),
+    }
+
+
+def run_measurement(file_type: str, pages: int, args) -> dict:
+    file_bytes = make_document(file_type, pages=pages, seed=args.seed)
+    file_mb = len(file_bytes) / 2**20
+
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        measured = executor.submit(
+            measure_document, file_type, file_bytes, args.repeats
+        ).result()
+
+    total = measured["total_seconds"]
+    return {
+        "format": file_type,
+        "pages": pages,
+        "file_mb": round(file_mb, 3),
+        "sentences": measured["sentences"],
+        "headers": measured["headers"],
+        "tables": measured["tables"],
+        "reader_pages": measured["reader_pages"],
+        "total_seconds": round(total, 4),
+        "converter_seconds": round(measured["converter_seconds"], 4),
+        "splitter_seconds": round(total - measured["converter_seconds"], 4),
+        "pages_per_second": round(pages / total, 2) if total else None,
+        "mb_per_second": round(file_mb / total, 3) if total else None,
+        "baseline_rss_mb": measured["baseline_rss_mb"],
+        "peak_rss_mb": measured["peak_rss_mb"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--formats", nargs="+", choices=list(generators), default=list(generators)
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="ingestion_benchmark.json")
+    args = parser.parse_args()
+
+    report = {
+        "config": {"pages": args.pages, "repeats": args.repeats, "seed": args.seed},
+        "environment": {"python": platform.python_version()},
+        "results": [],
+    }
+
+    for file_type in args.formats:
+        for pages in args.pages:
+            try:
+                result = run_measurement(file_type=file_type, pages=pages, args=args)
+            except ImportError as e:
+                # Writer libraries of some formats are development only
+                logger.warning(f"Skipping {file_type}: {str(e)}")
+                report["results"].append({"format": file_type, "skipped": str(e)})
+                break
+            except Exception as e:
+                logger.error(f"{file_type} with {pages} pages failed: {str(e)}")
+                result = {"format": file_type, "pages": pages, "error": str(e)}
+
+            report["results"].append(result)
+            if "error" not in result:
+                logger.info(
+                    f"{file_type} {pages} pages: {result['pages_per_second']} pages/s, "
+                    f"{result['mb_per_second']} MB/s, converter "
+                    f"{result['converter_seconds']}s, splitter "
+                    f"{result['splitter_seconds']}s, {result['sentences']} sentences"
+                )
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
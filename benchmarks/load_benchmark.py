@@ -0,0 +1,400 @@
+"""End-to-end load test of the app against a fake OpenAI server
+
+Starts benchmarks.fake_openai and the FastAPI app under uvicorn, seeds load
+test users in Postgres and replays traffic through /qa/select_domain,
+/qa/generate_answer, /io/store_file and /io/upload_files at the given
+concurrency. Throughput, latency percentiles and error rates are reported
+per endpoint. Run from the repository root:
+
+    python -m benchmarks.load_benchmark --users 50 --duration 120 --app-workers 2
+
+Redis (localhost:6380) and the Postgres of app/db/database.ini must be
+running. Seeded users and their files are not removed, point the app at a
+disposable database. Pass --app-url to load an app that is already running
+with OPENAI_BASE_URL set to the fake server.
+"""
+
+from collections import defaultdict
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+import httpx
+import numpy as np
+
+from .documents import make_document
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# One log line per request would drown the report
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+QUESTIONS = [
+    "What was the revenue in the last quarter?",
+    "Summarize the compliance audit findings",
+    "Who owns the supplier invoice process?",
+    "Compare the budget and the expense forecast",
+    "Which incidents affected server capacity?",
+    "What does the policy say about employee onboarding?",
+    "List the contract renewal dates",
+    "How is backup recovery handled?",
+]
+
+
+class Recorder:
+    """Latencies and outcomes of requests, grouped by endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status, ok: bool):
+        self.latencies[endpoint].append(seconds * 1000)
+        self.statuses[endpoint][str(status)] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, duration: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            percentiles = np.percentile(latencies, [50, 90, 95, 99])
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(latencies), 4),
+                "throughput_rps": round(len(latencies) / duration, 2),
+                "p50_ms": round(float(percentiles[0]), 1),
+                "p90_ms": round(float(percentiles[1]), 1),
+                "p95_ms": round(float(percentiles[2]), 1),
+                "p99_ms": round(float(percentiles[3]), 1),
+                "max_ms": round(float(np.max(latencies)), 1),
+                "statuses": dict(self.statuses[endpoint]),
+            }
+        return endpoints
+
+
+class VirtualUser:
+    """Seeded user replaying a mix of ingestion and question traffic"""
+
+    def __init__(self, client: httpx.AsyncClient, user: dict, recorder, args):
+        self.client = client
+        self.user = user
+        self.recorder = recorder
+        self.args = args
+        self.rng = random.Random(user["user_id"])
+        self.file_ids = []
+        self.files_stored = 0
+
+    async def request(self, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(
+                endpoint, time.perf_counter() - start, type(e).__name__, False
+            )
+            return None
+        self.recorder.record(
+            endpoint,
+            time.perf_counter() - start,
+            response.status_code,
+            response.is_success,
+        )
+        return response
+
+    async def select_domain(self):
+        await self.request(
+            "select_domain",
+            "POST",
+            "/api/v1/qa/select_domain",
+            params={"userID": self.user["user_id"]},
+            json={"domain_id": self.user["domain_id"]},
+        )
+
+    async def generate_answer(self):
+        if not self.file_ids:
+            return await self.ingest()
+        await self.request(
+            "generate_answer",
+            "POST",
+            "/api/v1/qa/generate_answer",
+            params={
+                "userID": self.user["user_id"],
+                "sessionID": self.user["session_id"],
+            },
+            json={
+                "user_message": self.rng.choice(QUESTIONS[: self.args.question_pool]),
+                "file_ids": self.file_ids,
+            },
+        )
+
+    async def ingest(self):
+        """Store a new file, wait for its job and upload it to the domain"""
+        self.files_stored += 1
+        file_name = f"loadtest_{self.files_stored}_{uuid.uuid4().hex[:8]}.{self.args.file_format}"
+        file_bytes = make_document(
+            self.args.file_format, pages=self.args.file_pages, seed=self.rng.random()
+        )
+
+        start = time.perf_counter()
+        response = await self.request(
+            "store_file",
+            "POST",
+            "/api/v1/io/store_file",
+            params={"userID": self.user["user_id"]},
+            files={"file": (file_name, file_bytes)},
+            data={"lastModified": str(int(time.time() * 1000))},
+        )
+        if response is None or not response.is_success:
+            return
+
+        job_id = response.json()["job_id"]
+        status = await self.wait_for_job(job_id)
+        self.recorder.record(
+            "ingestion_job", time.perf_counter() - start, status, status == "done"
+        )
+        if status != "done":
+            return
+
+        response = await self.request(
+            "upload_files",
+            "POST",
+            "/api/v1/io/upload_files",
+            params={"userID": self.user["user_id"]},
+        )
+        if response is not None and response.is_success:
+            self.file_ids = response.json().get("file_ids") or self.file_ids
+
+    async def wait_for_job(self, job_id: str) -> str:
+        deadline = time.monotonic() + self.args.ingestion_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.args.poll_interval)
+            try:
+                response = await self.client.get(
+                    "/api/v1/io/ingestion_status",
+                    params={"userID": self.user["user_id"], "jobIDs": job_id},
+                )
+            except httpx.HTTPError:
+                continue
+            if response.is_success:
+                status = response.json()["jobs"][0]["status"]
+                if status in ["done", "failed", "unknown"]:
+                    return status
+        return "timeout"
+
+    async def run(self, deadline: float):
+        await self.select_domain()
+        await self.ingest()
+
+        actions = {
+            self.generate_answer: self.args.answer_weight,
+            self.select_domain: self.args.select_weight,
+            self.ingest: self.args.ingest_weight,
+        }
+        while time.monotonic() < deadline:
+            if self.files_stored >= self.args.max_files_per_user:
+                actions.pop(self.ingest, None)
+            action = self.rng.choices(list(actions), weights=list(actions.values()))[0]
+            await action()
+            if self.args.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+
+def seed_users(amount: int) -> list:
+    """Users with an empty domain and a session, not subject to free quotas"""
+    from app.db.database import Database
+
+    users = []
+    with Database() as db:
+        for _ in range(amount):
+            user = {
+                "user_id": str(uuid.uuid4()),
+                "domain_id": str(uuid.uuid4()),
+                "session_id": str(uuid.uuid4()),
+            }
+            db.insert_user_info(
+                user_id=user["user_id"],
+                google_id=str(uuid.uuid4()),
+                user_name="Load",
+                user_surname="Test",
+                user_password=str(uuid.uuid4()),
+                user_email=f"loadtest-{user['user_id']}@example.com",
+                user_type="premium",
+                is_active=True,
+                refresh_token=str(uuid.uuid4()),
+                access_token=str(uuid.uuid4()),
+                picture_url=str(uuid.uuid4()),
+            )
+            db.insert_domain_info(
+                user_id=user["user_id"],
+                domain_id=user["domain_id"],
+                domain_name="Load Test",
+                domain_type=1,
+            )
+            db.insert_session_info(user["user_id"], session_id=user["session_id"])
+            users.append(user)
+    return users
+
+
+def start_process(command: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(command, env={**os.environ, **env})
+
+
+def wait_until_ready(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+
+async def run_load(users: list, args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=args.users, max_keepalive_connections=args.users
+    )
+    async with httpx.AsyncClient(
+        base_url=args.app_url, timeout=args.request_timeout, limits=limits
+    ) as client:
+        deadline = time.monotonic() + args.duration
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[VirtualUser(client, user, recorder, args).run(deadline) for user in users]
+        )
+        duration = time.perf_counter() - start
+
+    endpoints = recorder.summary(duration)
+    requests = sum(stats["requests"] for stats in endpoints.values())
+    errors = sum(stats["errors"] for stats in endpoints.values())
+    return {
+        "duration_seconds": round(duration, 2),
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / duration, 2),
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent users")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--app-url", help="load a running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8900)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--ingestion-workers", type=int, default=2)
+    parser.add_argument("--openai-port", type=int, default=8901)
+    parser.add_argument("--chat-latency-ms", type=float, default=600)
+    parser.add_argument("--embedding-latency-ms", type=float, default=150)
+    parser.add_argument("--token-delay-ms", type=float, default=15)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--answer-weight", type=float, default=8)
+    parser.add_argument("--select-weight", type=float, default=1)
+    parser.add_argument("--ingest-weight", type=float, default=1)
+    parser.add_argument("--max-files-per-user", type=int, default=5)
+    parser.add_argument("--question-pool", type=int, default=len(QUESTIONS))
+    parser.add_argument("--file-format", default="txt")
+    parser.add_argument("--file-pages", type=int, default=5)
+    parser.add_argument("--think-time", type=float, default=0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--ingestion-timeout", type=float, default=300)
+    parser.add_argument("--request-timeout", type=float, default=120)
+    parser.add_argument("--output", default="load_benchmark.json")
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        if not args.app_url:
+            processes.append(
+                start_process(
+                    [
+                        sys.executable,
+                        "-m",
+                        "benchmarks.fake_openai",
+                        "--port",
+                        str(args.openai_port),
+                        "--chat-latency-ms",
+                        str(args.chat_latency_ms),
+                        "--embedding-latency-ms",
+                        str(args.embedding_latency_ms),
+                        "--token-delay-ms",
+                        str(args.token_delay_ms),
+                        "--error-rate",
+                        str(args.openai_error_rate),
+                    ],
+                    env={},
+                )
+            )
+            wait_until_ready(f"http://127.0.0.1:{args.openai_port}/docs")
+
+            # Jobs must be visible to every app worker, so they go through Redis
+            processes.append(
+                start_process(
+                    [
+                        sys.executable,
+                        "-m",
+                        "uvicorn",
+                        "app.main:app",
+                        "--port",
+                        str(args.app_port),
+                        "--workers",
+                        str(args.app_workers),
+                        "--log-level",
+                        "warning",
+                    ],
+                    env={
+                        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+                        "OPENAI_API_KEY": "load-test",
+                        "EMBEDDING_PROVIDER": "openai",
+                        "INGESTION_QUEUE_BACKEND": "redis",
+                        "INGESTION_WORKERS": str(args.ingestion_workers),
+                        "MIDDLEWARE_SECRET_KEY": os.getenv(
+                            "MIDDLEWARE_SECRET_KEY", "load-test"
+                        ),
+                    },
+                )
+            )
+            args.app_url = f"http://127.0.0.1:{args.app_port}"
+            wait_until_ready(f"{args.app_url}/api/version")
+
+        users = seed_users(args.users)
+        logger.info(f"Seeded {len(users)} users, loading {args.app_url}")
+        result = asyncio.run(run_load(users=users, args=args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+    report = {
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ["output", "app_url"]
+        },
+        **result,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for endpoint, stats in result["endpoints"].items():
+        logger.info(
+            f"{endpoint}: {stats['requests']} requests, {stats['throughput_rps']} rps, "
+            f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms, "
+            f"errors {stats['error_rate'] * 100:.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
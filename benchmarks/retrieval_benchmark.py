@@ -0,0 +1,206 @@
+"""Retrieval pipeline benchmark on synthetic domains
+
+Times Processor.filter_search, the search and fusion step of search_index
+(Processor.rank_sentences) and Processor.context_creator on their own, with
+query embeddings generated locally and no LLM calls. Run from the repository
+root:
+
+    python -m benchmarks.retrieval_benchmark --sizes 1000 10000 100000 1000000
+
+Peak memory is measured with tracemalloc, which sees Python and numpy
+allocations but not the internal buffers of FAISS, peak RSS of the process
+is reported next to it.
+"""
+
+from importlib import metadata
+import argparse
+import base64
+import json
+import os
+import platform
+import resource
+import time
+import tracemalloc
+import numpy as np
+
+# Nothing is sent to OpenAI, placeholders only let the services start
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ENCRYPTION_KEY", base64.b64encode(os.urandom(32)).decode())
+
+from app.api.core import Processor  # noqa: E402
+from .synthetic import make_domain, make_queries  # noqa: E402
+
+
+def measure(function, calls: list) -> dict:
+    """Latency percentiles over calls, peak memory of one more traced call"""
+    function(**calls[0])
+
+    latencies = []
+    for kwargs in calls:
+        start = time.perf_counter()
+        function(**kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    function(**calls[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "max_ms": round(float(np.max(latencies)), 3),
+        "peak_memory_mb": round(peak / 2**20, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    # Linux reports kilobytes, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if platform.system() == "Darwin" else 2**10), 1)
+
+
+def run_size(processor: Processor, sentences: int, args) -> dict:
+    files = max(2, sentences // args.sentences_per_file)
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    domain_content, embeddings, centroids, topic_ids = make_domain(
+        encryptor=processor.en,
+        sentences=sentences,
+        files=files,
+        dimensions=args.dimensions,
+        seed=args.seed,
+    )
+    generate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_data = processor.create_search_data(
+        domain_content=domain_content, domain_embeddings=embeddings
+    )
+    build_seconds = time.perf_counter() - start
+    boost_info = search_data["boost_info"]
+
+    # Questions select about half of the files of the domain
+    file_selections = [
+        rng.choice(
+            boost_info["file_ids"], size=max(1, files // 2), replace=False
+        ).tolist()
+        for _ in range(args.queries)
+    ]
+    filter_calls = [
+        {"boost_info": boost_info, "file_ids": file_ids} for file_ids in file_selections
+    ]
+    selections = [processor.filter_search(**kwargs) for kwargs in filter_calls]
+
+    rank_calls = [
+        {
+            "query_embeddings": query_embeddings,
+            "boost_info": boost_info,
+            "index": search_data["index"],
+            "index_header": search_data["index_header"],
+            "selection": selection,
+        }
+        for query_embeddings, selection in zip(
+            make_queries(
+                centroids=centroids,
+                topic_pools=[
+                    np.unique(topic_ids[selection["sentence_mask"]])
+                    for selection in selections
+                ],
+                seed=args.seed,
+            ),
+            selections,
+        )
+    ]
+    ranked = [processor.rank_sentences(**kwargs) for kwargs in rank_calls]
+
+    context_calls = [
+        {
+            "sentence_index_list": sentence_indexes,
+            "domain_content": domain_content,
+            "header_indexes": boost_info["header_indexes"],
+            "table_indexes": boost_info["table_indexes"],
+            "file_run_offsets": boost_info["file_run_offsets"],
+        }
+        for sentence_indexes in ranked
+        if sentence_indexes
+    ]
+
+    stages = {
+        "filter_search": measure(processor.filter_search, filter_calls),
+        "search_fusion": measure(processor.rank_sentences, rank_calls),
+    }
+    if context_calls:
+        stages["context_creator"] = measure(processor.context_creator, context_calls)
+
+    return {
+        "sentences": sentences,
+        "files": files,
+        "index": type(search_data["index"]).__name__,
+        "search_data_mb": round(processor.search_data_size(search_data) / 2**20, 1),
+        "generate_seconds": round(generate_seconds, 3),
+        "build_seconds": round(build_seconds, 3),
+        "empty_results": len(ranked) - len(context_calls),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def package_version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--sentences-per-file", type=int, default=500)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="retrieval_benchmark.json")
+    args = parser.parse_args()
+
+    processor = Processor()
+    report = {
+        "config": {
+            "queries": args.queries,
+            "sentences_per_file": args.sentences_per_file,
+            "dimensions": args.dimensions,
+            "seed": args.seed,
+            "search_top_k": processor.search_top_k,
+            "exact_search": processor.exact_search,
+            "quantization": processor.indf.quantization,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": package_version("numpy"),
+            "faiss": package_version("faiss-cpu"),
+            "cpus": os.cpu_count(),
+        },
+        "results": [],
+    }
+
+    for sentences in args.sizes:
+        result = run_size(processor=processor, sentences=sentences, args=args)
+        report["results"].append(result)
+        print(
+            f"{sentences} sentences: "
+            + ", ".join(
+                f"{stage} p50 {stats['p50_ms']}ms p95 {stats['p95_ms']}ms"
+                for stage, stats in result["stages"].items()
+            )
+        )
+        # Written after every size so long runs keep their finished results
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
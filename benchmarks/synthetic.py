@@ -0,0 +1,114 @@
+from typing import List
+import numpy as np
+
+
+def make_topic_vectors(topics: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, dimensions)).astype(np.float32)
+    return centroids / np.linalg.norm(centroids, axis=1)[:, np.newaxis]
+
+
+def make_embeddings(
+    centroids: np.ndarray,
+    topic_ids: np.ndarray,
+    noise: float,
+    seed: int,
+    chunk_size: int = 65536,
+) -> np.ndarray:
+    """Unit float16 vectors scattered around the centroid of their topic"""
+    rng = np.random.default_rng(seed)
+    dimensions = centroids.shape[1]
+    embeddings = np.empty((len(topic_ids), dimensions), dtype=np.float16)
+    # Chunks keep the float32 scratch space small for million row domains
+    for start in range(0, len(topic_ids), chunk_size):
+        ids = topic_ids[start : start + chunk_size]
+        chunk = rng.standard_normal((len(ids), dimensions)).astype(np.float32)
+        chunk *= noise / np.sqrt(dimensions)
+        chunk += centroids[ids]
+        chunk /= np.linalg.norm(chunk, axis=1)[:, np.newaxis]
+        embeddings[start : start + len(ids)] = chunk
+    return embeddings
+
+
+def make_domain(
+    encryptor,
+    sentences: int,
+    files: int,
+    dimensions: int = 1536,
+    topics: int = 64,
+    seed: int = 0,
+):
+    """Encrypted domain rows and embeddings shaped like a stored domain
+
+    Rows are (sentence, is_header, is_table, page_number, file_id, file_name)
+    as returned by Database.get_file_content. About one row in fifteen is a
+    header and one in twenty a table, sentences of a file are contiguous.
+    Topic ids of the rows are returned too, queries should ask about topics
+    the domain actually covers.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = make_topic_vectors(topics=topics, dimensions=dimensions, seed=seed)
+
+    # Files cover a few neighbouring topics each, like real documents do
+    file_sizes = np.full(files, sentences // files)
+    file_sizes[: sentences % files] += 1
+    topic_ids = np.concatenate(
+        [
+            (file_index * 3 + rng.integers(0, 4, size)) % topics
+            for file_index, size in enumerate(file_sizes)
+        ]
+    )
+    embeddings = make_embeddings(
+        centroids=centroids, topic_ids=topic_ids, noise=0.6, seed=seed + 1
+    )
+
+    domain_content = []
+    row = 0
+    for file_index, size in enumerate(file_sizes):
+        file_id = f"00000000-0000-0000-0000-{file_index:012d}"
+        file_name = f"document_{file_index}.pdf"
+        for position in range(size):
+            is_header = position % 15 == 0
+            is_table = not is_header and position % 20 == 7
+            text = (
+                f"Section {position // 15} of document {file_index}"
+                if is_header
+                else f"Sentence {row} about topic {topic_ids[row]} in document {file_index}."
+            )
+            domain_content.append(
+                (
+                    encryptor.encrypt(text, file_id),
+                    is_header,
+                    is_table,
+                    position // 40 + 1,
+                    file_id,
+                    file_name,
+                )
+            )
+            row += 1
+
+    return domain_content, embeddings, centroids, topic_ids
+
+
+def make_queries(
+    centroids: np.ndarray,
+    topic_pools: List[np.ndarray],
+    seed: int = 0,
+    per_question: int = 3,
+) -> List[np.ndarray]:
+    """Query embedding sets of questions, like query_generation would produce
+
+    Each question asks about one topic of its pool, such as the topics of the
+    files it selects.
+    """
+    rng = np.random.default_rng(seed)
+    topic_ids = [rng.choice(topic_pool) for topic_pool in topic_pools]
+    return [
+        make_embeddings(
+            centroids=centroids,
+            topic_ids=np.full(per_question, topic_id),
+            noise=0.3,
+            seed=seed + i,
+        )
+        for i, topic_id in enumerate(topic_ids)
+    ]
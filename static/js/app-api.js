@@ -182,7 +182,7 @@ window.deleteDomain = async function deleteDomain(domainId) {
     }
 };
 
-window.storeFile = async function(userID, formData) {
+window.storeFile = async function(userID, formData, onProgress) {
     try {
         const response = await fetch(`/api/v1/io/store_file?userID=${encodeURIComponent(userID)}`, {
             method: 'POST',
@@ -199,7 +199,7 @@ window.storeFile = async function(userID, formData) {
             return 0;
         }
 
-        return 1;
+        return await window.waitForIngestionJob(userID, data.job_id, onProgress);
 
     } catch (error) {
         console.error('Error storing file:', error);
@@ -210,7 +210,7 @@ window.storeFile = async function(userID, formData) {
     }
 };
 
-window.storedriveFile = async function(userID, formData) {
+window.storedriveFile = async function(userID, formData, onProgress) {
     try {
         const response = await fetch(`/api/v1/io/store_drive_file?userID=${encodeURIComponent(userID)}`, {
             method: 'POST',
@@ -227,7 +227,7 @@ window.storedriveFile = async function(userID, formData) {
             return 0;
         }
 
-        return 1;
+        return await window.waitForIngestionJob(userID, data.job_id, onProgress);
 
     } catch (error) {
         console.error('Error storing file:', error);
@@ -258,7 +258,7 @@ window.storeURL = async function(userID, url) {
             return 0;
         }
 
-        return 1;
+        return await window.waitForIngestionJob(userID, data.job_id);
 
     } catch (error) {
         console.error('Error storing URL:', error);
@@ -269,6 +269,33 @@ window.storeURL = async function(userID, url) {
     }
 };
 
+window.waitForIngestionJob = async function(userID, jobId, onProgress, interval = 1000) {
+    // Files are processed in the background, poll until the job finishes
+    while (true) {
+        const response = await fetch(`/api/v1/io/ingestion_status?userID=${encodeURIComponent(userID)}&jobIDs=${encodeURIComponent(jobId)}`);
+
+        if (!response.ok) {
+            throw new Error('Failed to get file status');
+        }
+
+        const data = await response.json();
+        const job = data.jobs[0];
+
+        if (onProgress && job.progress !== undefined) {
+            onProgress(job.progress, job.stage);
+        }
+
+        if (job.status === 'done') {
+            return 1;
+        } else if (job.status === 'failed' || job.status === 'unknown') {
+            console.error('Error processing file:', job.error);
+            return 0;
+        }
+
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+};
+
 window.uploadFiles = async function(userID) {
     try {
         const response = await fetch(`/api/v1/io/upload_files?userID=${userID}`, {
@@ -396,6 +423,107 @@ window.sendMessage = async function(message, userId, sessionId, fileIds) {
     }
 };
 
+window.sendMessageStream = async function(message, userId, sessionId, fileIds, handlers = {}) {
+    if (!message) {
+        return {
+            message: "Please enter your sentence!",
+            status: 400
+        };
+    }
+
+    try {
+        const url = `/api/v1/qa/generate_answer_stream?userID=${encodeURIComponent(userId)}&sessionID=${encodeURIComponent(sessionId)}`;
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ 
+                user_message: message,
+                file_ids: fileIds
+            })
+        });
+
+        const contentType = response.headers.get('Content-Type') || '';
+
+        // Checks and messages without resources come back as plain JSON
+        if (!contentType.includes('text/event-stream')) {
+            const data = await response.json();
+
+            if (data.message && data.message.includes("Daily question limit reached")) {
+                return {
+                    message: data.message || 'Daily question limit reached!',
+                    status: 400
+                };
+            }
+
+            if (!response.ok) {
+                return {
+                    message: data.message || 'Server error!',
+                    status: response.status
+                };
+            }
+
+            return {
+                ...data,
+                status: 200
+            };
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const result = { answer: '', status: 200 };
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+
+            for (const rawEvent of events) {
+                let event = 'message';
+                let data = '';
+                for (const line of rawEvent.split('\n')) {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        data += line.slice(5).trim();
+                    }
+                }
+                if (!data) continue;
+                const payload = JSON.parse(data);
+
+                if (event === 'resources') {
+                    result.resources = payload.resources;
+                    result.resource_sentences = payload.resource_sentences;
+                    result.question_count = payload.question_count;
+                    if (handlers.onResources) handlers.onResources(payload);
+                } else if (event === 'token') {
+                    result.answer += payload.token;
+                    if (handlers.onToken) handlers.onToken(payload.token, result.answer);
+                } else if (event === 'done') {
+                    result.answer = payload.answer;
+                } else if (event === 'error') {
+                    return {
+                        message: payload.message,
+                        status: 500
+                    };
+                }
+            }
+        }
+
+        return result;
+
+    } catch (error) {
+        console.error('Error:', error);
+        return {
+            message: 'Error generating message!',
+            status: 500
+        };
+    }
+};
+
 window.sendFeedback = async function(formData, userId) {
     try {
         const url = `/api/v1/db/insert_feedback?userID=${encodeURIComponent(userId)}`;
@@ -1262,11 +1262,15 @@ class FileUploadModal extends Component {
             fileItem.classList.remove('pending-upload');
             fileItem.classList.add('uploading');
             
+            const onProgress = (progress) => {
+                progressBar.style.width = `${Math.round(progress * 100)}%`;
+            };
+
             let success;
             if (formData.has('driveFileId')) {
-                success = await window.storedriveFile(window.serverData.userId, formData);
+                success = await window.storedriveFile(window.serverData.userId, formData, onProgress);
             } else {
-                success = await window.storeFile(window.serverData.userId, formData);
+                success = await window.storeFile(window.serverData.userId, formData, onProgress);
             }
 
             if (success) {
@@ -1601,15 +1605,32 @@ class ChatManager extends Component {
         try {
             const selectedFileIds = window.app.sidebar.getSelectedFileIds();
 
-            const response = await window.sendMessage(
+            // Resources arrive first, answer text is rendered as it streams
+            let streamedMessage = null;
+            const response = await window.sendMessageStream(
                 message, 
                 window.serverData.userId,
                 window.serverData.sessionId,
-                selectedFileIds
+                selectedFileIds,
+                {
+                    onResources: (data) => {
+                        loadingMessage.remove();
+                        streamedMessage = this.addMessage('', 'ai');
+                        this.updateResources(data.resources, data.resource_sentences);
+                    },
+                    onToken: (token, answer) => {
+                        streamedMessage.querySelector('.message-text').innerHTML = this.formatMessage(answer);
+                        this.scrollToBottom();
+                    }
+                }
             );
     
             // Remove loading message
             loadingMessage.remove();
+
+            if (streamedMessage && response.status !== 200) {
+                streamedMessage.remove();
+            }
     
             if (response.status === 400) {
                 if (response.message.includes('Daily question limit')) {
@@ -1649,7 +1670,14 @@ class ChatManager extends Component {
                 return;
             }
     
-            if (response.answer && response.question_count == 10) {
+            if (response.answer && streamedMessage) {
+                streamedMessage.querySelector('.message-text').innerHTML = this.formatMessage(response.answer);
+                if (response.question_count == 10) {
+                    this.events.emit('ratingModalOpen');
+                }
+                window.app.profileLimitsModal.updateDailyCount(response.question_count);
+            }
+            else if (response.answer && response.question_count == 10) {
                 this.addMessage(response.answer, 'ai');
                 this.updateResources(response.resources, response.resource_sentences);
                 this.events.emit('ratingModalOpen');
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from app.answer_cache import AnswerCache
+from app.redis_manager import RedisManager
+from tests.test_parse_cache import BytesEncryptor
+
+
+class TestAnswerCache:
+    @pytest.fixture(scope="class")
+    def answer_cache(self):
+        """Fixture to provide an answer cache on the Redis manager"""
+        return AnswerCache(RedisManager(), encryptor=BytesEncryptor())
+
+    @pytest.fixture(scope="function")
+    def cleanup(self, answer_cache):
+        """Fixture to cleanup after each test"""
+        yield
+        answer_cache.invalidate_domain("test-domain")
+        answer_cache.similarity_threshold = 0
+        answer_cache.max_questions = 50
+
+    def test_make_key(self):
+        """Test keys are independent of file order"""
+        key = AnswerCache.make_key("test-domain", "v1", ["b", "a"])
+        assert key == AnswerCache.make_key("test-domain", "v1", ["a", "b"])
+        assert key != AnswerCache.make_key("test-domain", "v2", ["a", "b"])
+
+    def test_exact_question(self, answer_cache, cleanup):
+        """Test answers are returned for the same normalized question"""
+        key = answer_cache.make_key("test-domain", "v1", ["a"])
+        answer_cache.put(key, question="What is RAG?", answer={"answer": "42"})
+
+        assert answer_cache.get(key, question="what is  rag?") == {"answer": "42"}
+        assert answer_cache.get(key, question="What is FAISS?") is None
+
+    def test_similar_question(self, answer_cache, cleanup):
+        """Test similar questions only hit above the similarity threshold"""
+        key = answer_cache.make_key("test-domain", "v1", ["a"])
+        embedding = np.array([1.0, 0.0], dtype=np.float16)
+        answer_cache.put(key, "first", {"answer": "42"}, question_embedding=embedding)
+
+        similar = np.array([0.96, 0.28], dtype=np.float16)
+        assert answer_cache.get(key, "second", question_embedding=similar) is None
+
+        answer_cache.similarity_threshold = 0.95
+        assert answer_cache.get(key, "second", question_embedding=similar) == {
+            "answer": "42"
+        }
+
+    def test_encrypted_entries(self, answer_cache, cleanup):
+        """Test stored entries do not hold the answer and are bound to the domain"""
+        key = answer_cache.make_key("test-domain", "v1", ["a"])
+        answer_cache.put(key, question="What is RAG?", answer={"answer": "secret"})
+
+        stored = answer_cache.redis_manager.get_list_bytes(key)
+        assert len(stored) == 1 and b"secret" not in stored[0]
+
+        other_key = answer_cache.make_key("test-domain-2", "v1", ["a"])
+        answer_cache.redis_manager.push_capped_list(other_key, stored[0], 50)
+        try:
+            assert answer_cache.get(other_key, question="What is RAG?") is None
+        finally:
+            answer_cache.redis_manager.delete_data(other_key)
+
+    def test_max_questions(self, answer_cache, cleanup):
+        """Test only the newest questions of a key are kept"""
+        answer_cache.max_questions = 2
+        key = answer_cache.make_key("test-domain", "v1", ["a"])
+        for number in range(3):
+            answer_cache.put(key, f"question {number}", {"answer": number})
+
+        assert answer_cache.get(key, "question 0") is None
+        assert answer_cache.get(key, "question 2") == {"answer": 2}
+        assert len(answer_cache.redis_manager.get_list_bytes(key)) == 2
+
+    def test_invalidate_domain(self, answer_cache, cleanup):
+        """Test all versions of a domain are dropped"""
+        answer_cache.put(answer_cache.make_key("test-domain", "v1", ["a"]), "q", {})
+        answer_cache.put(answer_cache.make_key("test-domain", "v2", ["a"]), "q", {})
+
+        assert answer_cache.invalidate_domain("test-domain") == 2
@@ -0,0 +1,54 @@
+import pytest
+from app.api.core import Processor
+
+
+class TestWindowBounds:
+    @pytest.fixture(scope="function")
+    def window(self):
+        """Fixture to provide window bounds of a file spanning rows 10 to 69"""
+
+        def bounds(sentence_index, header_indexes, window_size=2):
+            start, end = Processor.window_bounds(
+                sentence_index=sentence_index,
+                window_size=window_size,
+                header_indexes=header_indexes,
+                lower=10,
+                upper=69,
+            )
+            return int(start), int(end)
+
+        return bounds
+
+    def test_without_headers(self, window):
+        """Test windows are the sentence and its neighbours, clamped to the file"""
+        assert window(30, []) == (28, 32)
+        assert window(11, [], window_size=4) == (10, 15)
+        assert window(68, []) == (66, 69)
+
+    def test_header_sentence(self, window):
+        """Test a header opens its window and stretches to a near next header"""
+        assert window(20, [20, 30]) == (20, 29)
+        assert window(20, [20, 50]) == (20, 22)
+        assert window(60, [20, 60]) == (60, 62)
+
+    def test_between_headers(self, window):
+        """Test sentences stretch to headers at most 20 sentences away"""
+        assert window(25, [20, 30]) == (20, 29)
+        assert window(40, [12, 68]) == (38, 42)
+        assert window(35, [12, 50]) == (33, 49)
+
+    def test_after_last_header(self, window):
+        """Test sentences after the last header keep their plain window"""
+        assert window(40, [20, 30]) == (38, 42)
+
+    def test_before_first_header(self, window):
+        """Test sentences before the first header measure to the last header"""
+        assert window(15, [20, 30]) == (15, 17)
+        assert window(15, [20, 40]) == (13, 17)
+
+    def test_other_files_headers(self, window):
+        """Test headers of other files do not change the window"""
+        headers = [20, 30]
+        assert window(25, [3] + headers + [75]) == window(25, headers)
+        assert window(15, [3] + headers + [75]) == window(15, headers)
+        assert window(40, [5] + headers + [71]) == window(40, headers)
@@ -0,0 +1,84 @@
+import asyncio
+import numpy as np
+import pytest
+from app.functions.embedding_batcher import EmbeddingBatcher
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TestEmbeddingBatcher:
+    @pytest.fixture(scope="function")
+    def batcher(self):
+        """Fixture to provide a batcher with small batches and no backoff"""
+        batcher = EmbeddingBatcher(rate_limit_errors=(RateLimited,))
+        batcher.max_batch_tokens = 10
+        batcher.max_batch_inputs = 3
+        batcher.backoff = 0
+        return batcher
+
+    def test_pack(self, batcher):
+        """Test batches respect token and input limits and cover all sentences"""
+        sentences = ["a" * 12, "b", "c", "d", "e", "f" * 40, "g"]
+        batches = batcher.pack(sentences)
+
+        assert batches == [(0, 3), (3, 5), (5, 6), (6, 7)]
+
+    def test_order_with_rate_limits(self, batcher):
+        """Test results keep input order when requests are retried"""
+        sentences = [str(i) for i in range(20)]
+        failures = {"3": 2}
+        max_in_flight, in_flight = [0], [0]
+
+        async def request(batch):
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            if failures.get(batch[0], 0):
+                failures[batch[0]] -= 1
+                raise RateLimited()
+            return np.array([[float(sentence)] for sentence in batch])
+
+        embeddings = asyncio.run(batcher.embed(sentences, request))
+
+        assert embeddings[:, 0].tolist() == list(range(20))
+        assert 1 < max_in_flight[0] <= batcher.max_concurrency
+
+    def test_retry_limit(self, batcher):
+        """Test requests failing on every attempt raise the error"""
+        batcher.max_retries = 2
+
+        async def request(batch):
+            raise RateLimited()
+
+        with pytest.raises(RateLimited):
+            asyncio.run(batcher.embed(["a"], request))
+
+    def test_shared_limiter(self, batcher):
+        """Test a rate limit in one embed call lowers the ceiling of another"""
+        batcher.max_batch_inputs = 1
+        rate_limited = ["a"]
+        in_flight, max_in_flight = [0], [0]
+
+        async def request(batch):
+            if batch[0] in rate_limited:
+                rate_limited.remove(batch[0])
+                raise RateLimited()
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return np.zeros((len(batch), 1))
+
+        async def embed_both():
+            return await asyncio.gather(
+                batcher.embed(["a"], request),
+                batcher.embed([str(i) for i in range(8)], request),
+            )
+
+        first, second = asyncio.run(embed_both())
+
+        assert len(first) == 1 and len(second) == 8
+        assert max_in_flight[0] < batcher.concurrency
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from app.embedding_cache import QueryEmbeddingCache, SentenceEmbeddingCache
+
+
+class TestQueryEmbeddingCache:
+    @pytest.fixture(scope="function")
+    def query_cache(self):
+        """Fixture to provide a small local cache"""
+        return QueryEmbeddingCache(max_entries=2)
+
+    def test_make_key(self):
+        """Test keys ignore case and whitespace but not the model"""
+        key = QueryEmbeddingCache.make_key("model", "  What is  RAG? ")
+        assert key == QueryEmbeddingCache.make_key("model", "what is rag?")
+        assert key != QueryEmbeddingCache.make_key("other", "what is rag?")
+
+    def test_hits_and_misses(self, query_cache):
+        """Test counters follow cache lookups"""
+        embedding = np.ones(4, dtype=np.float16)
+        assert query_cache.get("k1") is None
+        query_cache.put("k1", embedding)
+        assert np.array_equal(query_cache.get("k1"), embedding)
+
+        stats = query_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self, query_cache):
+        """Test least recently used queries are evicted"""
+        query_cache.put("k1", np.zeros(4))
+        query_cache.put("k2", np.zeros(4))
+        query_cache.get("k1")
+        query_cache.put("k3", np.zeros(4))
+
+        assert query_cache.get("k1") is not None
+        assert query_cache.get("k2") is None
+        assert query_cache.get_stats()["entries"] == 2
+
+
+class TestSentenceEmbeddingCache:
+    @pytest.fixture(scope="function")
+    def sentence_cache(self, tmp_path):
+        """Fixture to provide a cache in a temporary local file"""
+        return SentenceEmbeddingCache(
+            backend="disk", path=str(tmp_path / "embeddings.sqlite3")
+        )
+
+    def test_make_key(self):
+        """Test keys depend on the exact text and the model"""
+        key = SentenceEmbeddingCache.make_key("model", "Some sentence.")
+        assert key == SentenceEmbeddingCache.make_key("model", "Some sentence.")
+        assert key != SentenceEmbeddingCache.make_key("model", "some sentence.")
+        assert key != SentenceEmbeddingCache.make_key("other", "Some sentence.")
+
+    def test_get_and_put(self, sentence_cache):
+        """Test only stored keys are returned, as float16 embeddings"""
+        key1 = SentenceEmbeddingCache.make_key("model", "first")
+        key2 = SentenceEmbeddingCache.make_key("model", "second")
+        embedding = np.linspace(-1, 1, 8).astype(np.float16)
+
+        assert sentence_cache.get_many([key1, key2]) == {}
+        sentence_cache.put_many({key1: embedding})
+        found = sentence_cache.get_many([key1, key2])
+
+        assert list(found) == [key1]
+        assert found[key1].dtype == np.float16
+        assert np.array_equal(found[key1], embedding)
+        assert sentence_cache.get_stats()["hits"] == 1
+        assert sentence_cache.get_stats()["misses"] == 3
+
+    def test_persistence(self, sentence_cache, tmp_path):
+        """Test embeddings outlive the cache instance that stored them"""
+        key = SentenceEmbeddingCache.make_key("model", "kept")
+        sentence_cache.put_many({key: np.ones(4, dtype=np.float16)})
+
+        reopened = SentenceEmbeddingCache(
+            backend="disk", path=str(tmp_path / "embeddings.sqlite3")
+        )
+        assert key in reopened.get_many([key])
+
+    def test_disabled(self):
+        """Test a disabled cache always misses"""
+        sentence_cache = SentenceEmbeddingCache(backend="none")
+        key = SentenceEmbeddingCache.make_key("model", "text")
+        sentence_cache.put_many({key: np.ones(4, dtype=np.float16)})
+        assert sentence_cache.get_many([key]) == {}
@@ -0,0 +1,46 @@
+import asyncio
+import numpy as np
+import pytest
+from app.functions.embedding_providers import (
+    LocalEmbeddingProvider,
+    get_embedding_provider,
+)
+
+
+class TestLocalEmbeddingProvider:
+    @pytest.fixture(scope="function")
+    def provider(self):
+        """Fixture to provide the offline provider"""
+        return get_embedding_provider("local")
+
+    def test_shape_and_normalization(self, provider):
+        """Test embeddings match the size and form of the OpenAI ones"""
+        embeddings = asyncio.run(provider.embed(["first sentence", "second one"]))
+
+        assert embeddings.shape == (2, 1536)
+        assert embeddings.dtype == np.float16
+        assert np.allclose(np.linalg.norm(embeddings, axis=1), 1, atol=1e-2)
+
+    def test_deterministic(self, provider):
+        """Test the same text always gets the same embedding"""
+        first = asyncio.run(provider.embed(["Revenue grew in 2023"]))
+        second = asyncio.run(LocalEmbeddingProvider().embed(["Revenue grew in 2023"]))
+        assert np.array_equal(first, second)
+
+    def test_shared_words_are_closer(self, provider):
+        """Test sentences sharing words score higher than unrelated ones"""
+        query, related, unrelated = asyncio.run(
+            provider.embed(
+                [
+                    "annual revenue report",
+                    "the revenue report of the year",
+                    "weather forecast for tomorrow",
+                ]
+            )
+        ).astype(np.float32)
+        assert query @ related > query @ unrelated
+
+    def test_unknown_provider(self):
+        """Test an unknown provider name is rejected"""
+        with pytest.raises(ValueError):
+            get_embedding_provider("unknown")
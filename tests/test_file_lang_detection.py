@@ -0,0 +1,27 @@
+from app.api.core import Processor
+
+
+class TestFileLangDetection:
+    def test_english_sentences(self):
+        """Test parsed English sentences with spaces and tables are detected"""
+        sentences = [
+            "Quarterly Report",
+            "Revenue grew by twelve percent compared to the previous quarter.",
+            "| Item | Owner | Amount |",
+            "Customer retention stayed above the target set by the board.",
+        ]
+        assert Processor.file_lang_detection(sentences=sentences) == "en"
+
+    def test_turkish_sentences(self):
+        """Test parsed Turkish sentences are detected"""
+        sentences = [
+            "Çeyrek Raporu",
+            "Gelir bir önceki çeyreğe göre yüzde on iki oranında arttı.",
+            "Müşteri bağlılığı yönetim kurulunun belirlediği hedefin üzerinde kaldı.",
+        ]
+        assert Processor.file_lang_detection(sentences=sentences) == "tr"
+
+    def test_never_empty(self):
+        """Test files without words still get a concrete language to store"""
+        assert Processor.file_lang_detection(sentences=[]) == "en"
+        assert Processor.file_lang_detection(sentences=["12.5", "| 3 | 4 |"]) == "en"
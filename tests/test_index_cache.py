@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from app.index_cache import IndexCache
+
+
+class TestIndexCache:
+    @pytest.fixture(scope="function")
+    def index_cache(self):
+        """Fixture to provide an empty cache with a small budget"""
+        cache = IndexCache()
+        cache.clear()
+        max_bytes = cache.max_bytes
+        cache.max_bytes = 100
+        yield cache
+        cache.clear()
+        cache.max_bytes = max_bytes
+
+    def test_content_version(self):
+        """Test version is independent of file order and changes with content"""
+        version = IndexCache.content_version(["b", "a"], 10)
+        assert version == IndexCache.content_version(["a", "b"], 10)
+        assert version != IndexCache.content_version(["a", "b"], 11)
+        assert version != IndexCache.content_version(["a"], 10)
+
+    def test_get_put(self, index_cache):
+        """Test entries are returned by domain and version"""
+        index_cache.put(index_cache.make_key("d1", "v1"), "data", 10)
+        assert index_cache.get(index_cache.make_key("d1", "v1")) == "data"
+        assert index_cache.get(index_cache.make_key("d1", "v2")) is None
+
+    def test_lru_eviction(self, index_cache):
+        """Test least recently used entries are evicted over the budget"""
+        index_cache.put(("d1", "v"), "first", 40)
+        index_cache.put(("d2", "v"), "second", 40)
+        index_cache.get(("d1", "v"))
+        index_cache.put(("d3", "v"), "third", 40)
+
+        assert index_cache.get(("d1", "v")) == "first"
+        assert index_cache.get(("d2", "v")) is None
+        assert index_cache.get_memory_usage()["used_bytes"] == 80
+
+    def test_oversized_entry(self, index_cache):
+        """Test entries larger than the budget are not cached"""
+        assert not index_cache.put(("d1", "v"), "data", 101)
+        assert index_cache.get(("d1", "v")) is None
+
+    def test_invalidate_domain(self, index_cache):
+        """Test all versions of a domain are dropped"""
+        index_cache.put(("d1", "v1"), "old", 10)
+        index_cache.put(("d1", "v2"), "new", 10)
+        index_cache.put(("d2", "v1"), "other", 10)
+
+        assert index_cache.invalidate_domain("d1") == 2
+        assert index_cache.get(("d2", "v1")) == "other"
+        assert index_cache.get_memory_usage()["used_bytes"] == 10
+
+    def test_single_build(self, index_cache):
+        """Test concurrent misses share one build and old versions stay until it"""
+        index_cache.put(("d1", "v1"), "old", 10)
+        builds = []
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.01)
+            assert index_cache.get(("d1", "v1")) == "old"
+            return "new"
+
+        async def ask():
+            return await asyncio.gather(
+                *[
+                    index_cache.get_or_build(("d1", "v2"), build, lambda entry: 10)
+                    for _ in range(5)
+                ]
+            )
+
+        assert asyncio.run(ask()) == ["new"] * 5
+        assert len(builds) == 1
+        assert index_cache.get(("d1", "v1")) is None
+        assert index_cache.get(("d1", "v2")) == "new"
+
+    def test_failed_build(self, index_cache):
+        """Test waiters get the build error and the next miss builds again"""
+
+        async def build():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("build failed")
+
+        async def ask():
+            return await asyncio.gather(
+                *[
+                    index_cache.get_or_build(("d1", "v1"), build, lambda entry: 10)
+                    for _ in range(3)
+                ],
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(e, RuntimeError) for e in asyncio.run(ask()))
+        assert index_cache._building == {}
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from app.job_queue import IngestionQueue, IngestionError, LocalJobStore
+
+
+class TestIngestionQueue:
+    @pytest.fixture(scope="function")
+    def queue(self):
+        """Fixture to provide a queue on the local job store without retry delay"""
+        queue = IngestionQueue(LocalJobStore())
+        queue.retry_delay = 0
+        return queue
+
+    def test_enqueue_status(self, queue):
+        """Test new jobs are queued and only visible to their user"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {}, payload=b"data")
+        status = queue.get_status(job_id, "u1")
+
+        assert status["status"] == "queued"
+        assert status["progress"] == 0.0
+        assert queue.get_status(job_id, "u2") is None
+
+    def test_process_job(self, queue):
+        """Test handlers get the payload and finished jobs are acknowledged"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {}, payload=b"data")
+        payloads = []
+
+        async def handler(job, payload):
+            queue.update_stage(job["job_id"], "embedding")
+            payloads.append(payload)
+
+        asyncio.run(queue.process_job(queue.store.pop(), handler))
+
+        assert payloads == [b"data"]
+        assert queue.get_status(job_id, "u1")["status"] == "done"
+        assert queue.store.processing() == []
+        assert queue.store.get_payload(job_id) is None
+
+    def test_retry(self, queue):
+        """Test failing jobs are retried until the attempt limit"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {})
+
+        async def handler(job, payload):
+            raise ConnectionError("API unavailable")
+
+        for _ in range(queue.max_attempts):
+            queue.release_due_retries()
+            asyncio.run(queue.process_job(queue.store.pop(), handler))
+
+        status = queue.get_status(job_id, "u1")
+        assert status["status"] == "failed"
+        assert status["attempts"] == queue.max_attempts
+        assert queue.store.pop() is None
+
+    def test_permanent_failure(self, queue):
+        """Test ingestion errors fail the job without retries"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {})
+
+        async def handler(job, payload):
+            raise IngestionError("No content")
+
+        asyncio.run(queue.process_job(queue.store.pop(), handler))
+
+        status = queue.get_status(job_id, "u1")
+        assert status["status"] == "failed"
+        assert status["error"] == "No content"
+
+    def test_recover_stale_jobs(self, queue):
+        """Test jobs left running by a dead worker are queued again"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {})
+        queue.store.pop()
+        queue.stale_after = 0
+
+        assert queue.recover_stale_jobs() == 1
+        assert queue.store.pop() == job_id
+
+    def test_retry_backoff(self, queue):
+        """Test retries wait in the schedule instead of blocking the worker"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {})
+        queue.retry_delay = 60
+
+        async def handler(job, payload):
+            raise ConnectionError("API unavailable")
+
+        asyncio.run(queue.process_job(queue.store.pop(), handler))
+
+        assert queue.get_status(job_id, "u1")["status"] == "queued"
+        assert queue.store.processing() == []
+        assert queue.release_due_retries() == 0
+        assert queue.store.pop() is None
+
+        queue.retry_delay = 0
+        queue.store.schedule(job_id, 0)
+        assert queue.release_due_retries() == 1
+        assert queue.store.pop() == job_id
+
+    def test_heartbeat(self, queue):
+        """Test long running jobs renew their lease and are not recovered"""
+        job_id = queue.enqueue("u1", "file", "a.pdf", {})
+        queue.stale_after = 0.2
+        queue.heartbeat_interval = 0.05
+        recovered = []
+
+        async def handler(job, payload):
+            await asyncio.sleep(0.5)
+            recovered.append(queue.recover_stale_jobs())
+
+        asyncio.run(queue.process_job(queue.store.pop(), handler))
+
+        assert recovered == [0]
+        assert queue.get_status(job_id, "u1")["status"] == "done"
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+from app.index_cache import IndexCache
+from app.metrics import stage_timer, timed_stream
+
+
+def stage_count(stage):
+    return (
+        REGISTRY.get_sample_value("ragchat_qa_stage_seconds_count", {"stage": stage})
+        or 0
+    )
+
+
+class TestMetrics:
+    @pytest.fixture(scope="function")
+    def index_cache(self):
+        """Fixture to provide an empty index cache"""
+        cache = IndexCache()
+        cache.clear()
+        yield cache
+        cache.clear()
+
+    def test_stage_timer(self):
+        """Test each timed stage adds one observation to its histogram"""
+        before = stage_count("test_stage")
+        with stage_timer("test_stage"):
+            pass
+        assert stage_count("test_stage") == before + 1
+
+    def test_timed_stream(self):
+        """Test streamed tokens pass through and the stream is timed once"""
+
+        async def tokens():
+            for token in ["a", "b", "c"]:
+                yield token
+
+        async def consume():
+            return [token async for token in timed_stream("test_stream", tokens())]
+
+        before = stage_count("test_stream")
+        assert asyncio.run(consume()) == ["a", "b", "c"]
+        assert stage_count("test_stream") == before + 1
+
+    def test_index_cache_gauges(self, index_cache):
+        """Test cache gauges follow puts and clears"""
+        index_cache.put(("d1", "v"), "data", 40)
+        index_cache.put(("d2", "v"), "data", 10)
+        assert REGISTRY.get_sample_value("ragchat_index_cache_bytes") == 50
+        assert REGISTRY.get_sample_value("ragchat_index_cache_entries") == 2
+
+        index_cache.clear()
+        assert REGISTRY.get_sample_value("ragchat_index_cache_bytes") == 0
+        assert REGISTRY.get_sample_value("ragchat_index_cache_entries") == 0
@@ -0,0 +1,109 @@
+import os
+import time
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from app.parse_cache import ParseCache
+
+
+class BytesEncryptor:
+    """Byte encryption of Encryptor with a random key"""
+
+    def __init__(self):
+        self.aesgcm = AESGCM(AESGCM.generate_key(bit_length=256))
+
+    def encrypt_bytes(self, data: bytes, auth_data: str) -> bytes:
+        nonce = os.urandom(12)
+        return nonce + self.aesgcm.encrypt(nonce, data, auth_data.encode("utf-8"))
+
+    def decrypt_bytes(self, encrypted_data: bytes, auth_data: str) -> bytes:
+        return self.aesgcm.decrypt(
+            encrypted_data[:12], encrypted_data[12:], auth_data.encode("utf-8")
+        )
+
+
+class TestParseCache:
+    @pytest.fixture(scope="function")
+    def parse_cache(self, tmp_path):
+        """Fixture to provide a cache in a temporary directory"""
+        return ParseCache(
+            parser_version="1", directory=str(tmp_path), encryptor=BytesEncryptor()
+        )
+
+    @pytest.fixture(scope="function")
+    def file_data(self):
+        """Fixture to provide a parse result"""
+        return {
+            "sentences": ["# Title", "Some sentence of the document."],
+            "page_number": [1, 1],
+            "is_header": [True, False],
+            "is_table": [False, False],
+        }
+
+    def test_make_key(self, parse_cache, tmp_path):
+        """Test keys change with the content, file type and parser version"""
+        key = parse_cache.make_key(b"content", "pdf")
+        assert key == parse_cache.make_key(b"content", "pdf")
+        assert key != parse_cache.make_key(b"other content", "pdf")
+        assert key != parse_cache.make_key(b"content", "docx")
+
+        newer = ParseCache(
+            parser_version="2", directory=str(tmp_path), encryptor=BytesEncryptor()
+        )
+        assert key != newer.make_key(b"content", "pdf")
+
+    def test_get_and_put(self, parse_cache, file_data):
+        """Test stored parse results are returned unchanged"""
+        key = parse_cache.make_key(b"content", "pdf")
+        assert parse_cache.get(key) is None
+
+        parse_cache.put(key, file_data)
+        assert parse_cache.get(key) == file_data
+        assert parse_cache.get_stats() == {"hits": 1, "misses": 1}
+
+    def test_eviction(self, parse_cache, file_data):
+        """Test entries are removed once the cache is over its size"""
+        parse_cache.max_size_mb = 0
+        key = parse_cache.make_key(b"content", "pdf")
+        parse_cache.put(key, file_data)
+        assert parse_cache.get(key) is None
+
+    def test_encrypted_on_disk(self, parse_cache, file_data, tmp_path):
+        """Test document text is not readable from cache files"""
+        key = parse_cache.make_key(b"content", "pdf")
+        parse_cache.put(key, file_data)
+
+        [path] = tmp_path.glob("*/*.enc")
+        assert b"sentence" not in path.read_bytes()
+
+        other = ParseCache(
+            parser_version="1", directory=str(tmp_path), encryptor=BytesEncryptor()
+        )
+        assert other.get(key) is None
+
+    def test_expiry(self, parse_cache, file_data, tmp_path):
+        """Test entries older than the time to live are removed"""
+        key = parse_cache.make_key(b"content", "pdf")
+        parse_cache.put(key, file_data)
+        [path] = tmp_path.glob("*/*.enc")
+        old = time.time() - parse_cache.ttl - 60
+        os.utime(path, (old, old))
+
+        assert parse_cache.get(key) is None
+        assert not path.exists()
+
+    def test_requires_encryptor(self, file_data, tmp_path):
+        """Test nothing is stored without an encryptor"""
+        parse_cache = ParseCache(parser_version="1", directory=str(tmp_path))
+        parse_cache.put(parse_cache.make_key(b"content", "pdf"), file_data)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_size_tracked_between_sweeps(self, parse_cache, file_data, monkeypatch):
+        """Test puts under the budget update the size without scanning"""
+        parse_cache.put(parse_cache.make_key(b"first", "pdf"), file_data)
+        size = parse_cache._size
+        sweeps = []
+        monkeypatch.setattr(parse_cache, "_sweep", lambda: sweeps.append(1))
+
+        parse_cache.put(parse_cache.make_key(b"second", "pdf"), file_data)
+        assert sweeps == []
+        assert parse_cache._size > size
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import pytest
+from app import profiling
+from app.profiling import ProfilingMiddleware, current_profile_id, profile_path
+
+# Profile ids seen by handlers, like the jobs they queue would
+handler_profile_ids = []
+
+
+async def handler(scope, receive, send):
+    handler_profile_ids.append(current_profile_id.get())
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def run_request(middleware, headers=None, query_string=b""):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/qa/generate_answer",
+        "headers": headers or [],
+        "query_string": query_string,
+    }
+    asyncio.run(middleware(scope, receive, send))
+    return dict(messages[0]["headers"])
+
+
+class TestProfilingMiddleware:
+    @pytest.fixture(scope="function")
+    def middleware(self, tmp_path):
+        """Fixture to provide the middleware with a known token"""
+        return ProfilingMiddleware(handler, token="secret", directory=str(tmp_path))
+
+    def test_not_profiled_without_token(self, middleware, tmp_path):
+        """Test requests without the token pass through untouched"""
+        headers = run_request(middleware, query_string=b"userID=1")
+        assert b"x-profile-id" not in headers
+        assert os.listdir(tmp_path) == []
+
+    def test_wrong_token(self, middleware, tmp_path):
+        """Test a wrong token does not profile the request"""
+        headers = run_request(middleware, headers=[(b"x-profile-token", b"guess")])
+        assert b"x-profile-id" not in headers
+        assert os.listdir(tmp_path) == []
+
+    def test_profiled_with_header(self, middleware, tmp_path):
+        """Test a matching header saves a profile named in the response"""
+        headers = run_request(middleware, headers=[(b"x-profile-token", b"secret")])
+        profile_id = headers[b"x-profile-id"].decode()
+
+        assert profile_path(profile_id, str(tmp_path))
+        with open(tmp_path / f"{profile_id}.txt", encoding="utf-8") as file:
+            assert file.readline().startswith("POST /api/v1/qa/generate_answer")
+
+    def test_profile_id_for_jobs(self, middleware):
+        """Test handlers of profiled requests see the profile id, others none"""
+        run_request(middleware)
+        headers = run_request(middleware, headers=[(b"x-profile-token", b"secret")])
+
+        assert handler_profile_ids[-2:] == [None, headers[b"x-profile-id"].decode()]
+        assert current_profile_id.get() is None
+
+    def test_profile_call(self, tmp_path, monkeypatch):
+        """Test worker side calls are saved under the request's profile id"""
+        monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+        result = profiling.profile_call(
+            "20260101-000000-abcdef12-reading",
+            "read_file",
+            lambda file_bytes: file_bytes.decode(),
+            file_bytes=b"text",
+        )
+
+        assert result == "text"
+        assert profile_path("20260101-000000-abcdef12-reading", str(tmp_path))
+
+    def test_profiled_with_query(self, middleware):
+        """Test the profile query parameter works like the header"""
+        headers = run_request(middleware, query_string=b"userID=1&profile=secret")
+        assert b"x-profile-id" in headers
+
+    def test_profile_path(self, tmp_path):
+        """Test ids that could leave the profile directory are rejected"""
+        assert profile_path("../secrets", str(tmp_path)) is None
+        assert profile_path("20260101-000000-abcdef12", str(tmp_path)) is None
@@ -63,6 +63,22 @@ class TestRedisConnection:
             retrieved_data["nested"] == test_data["nested"]
         ), "Nested structure mismatch"
 
+    def test_array_operations(self, redis_manager, cleanup):
+        """Test raw array storage with row access"""
+        test_array = np.arange(24, dtype=np.float16).reshape(6, 4)
+
+        # Test set operation
+        assert redis_manager.set_array("test:array", test_array), "Failed to set array"
+
+        # Test full get operation
+        retrieved_array = redis_manager.get_array("test:array")
+        assert np.array_equal(retrieved_array, test_array), "Array data mismatch"
+        assert retrieved_array.dtype == np.float16, "Array dtype not preserved"
+
+        # Test row get operation
+        retrieved_rows = redis_manager.get_array_rows("test:array", [4, 1])
+        assert np.array_equal(retrieved_rows, test_array[[4, 1]]), "Array rows mismatch"
+
     def test_expiry(self, redis_manager, cleanup):
         """Test data expiration"""
         import time